@@ -8,40 +8,78 @@ With Chrome Extension and WebStore support
 
 import os
 import json
-import time
-import requests
 import logging
-from datetime import datetime
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from utilities import extract_phone, extract_year, extract_km, extract_brand, is_owner
+import lead_store
+from enrichment import ParallelEnricher, enrich_card
+from checkpoint import RunJournal
+import followups
+from snapshots import SnapshotArchive
+from sheets_sync import SheetSync
+from page_ready import wait_for_cards
+from detail_pages import DetailFetcher, DEFAULT_SELECTORS, merge_details
+import network_capture
+from models import Lead, canonical_url
+
+# selenium, webdriver_manager and requests are imported inside the methods
+# that need them, so importing this module (e.g. from the GUI) stays fast
+
+# Value of selenium's CSS_SELECTOR; card parsing works on any element
+# with find_element() and must not pull in selenium itself
+CSS_SELECTOR = "css selector"
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('agent.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def setup_logging(log_file='agent.log'):
+    """
+    Configure console + file logging (called by entry points, not on import)
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
+def is_browser_error(error):
+    """
+    True for failures of the browser session itself (crashed or hung
+    Chrome, invalid session id) as opposed to an element missing on a card;
+    these must reach the caller so it can replace the browser
+    """
+    try:
+        from selenium.common.exceptions import (
+            WebDriverException, NoSuchElementException, StaleElementReferenceException,
+        )
+    except ImportError:
+        return False
+    return isinstance(error, WebDriverException) and not isinstance(
+        error, (NoSuchElementException, StaleElementReferenceException)
+    )
+
 class LeadAgent:
-    def __init__(self, config_path='config.json'):
+    def __init__(self, config_path='config.json', interactive=True, stop_event=None):
         """
         Initialize Lead Agent with configuration
+        interactive=False never waits on the console (daemon mode)
+        stop_event: threading.Event set by another thread to end the run early
         """
         self.config = self.load_config(config_path)
+        self.interactive = interactive
+        self.stop_event = stop_event or threading.Event()
         self.driver = None
         self.webhook_url = self.config.get('webhook_url')
-        self.chrome_driver_path = self.setup_chromedriver()
+        # Set up on the first create_driver(), so nodes that never open a
+        # browser (cluster coordinator) do not download ChromeDriver
+        self.chrome_driver_path = None
+        self.enricher = ParallelEnricher.from_config(self.config)
+        self.journal = None
+        self.snapshots = None
         logger.info("Lead Agent initialized")
         
     def load_config(self, config_path):
@@ -80,6 +118,8 @@ class LeadAgent:
         Automatically download and setup ChromeDriver
         Returns path to ChromeDriver
         """
+        from webdriver_manager.chrome import ChromeDriverManager
+        
         try:
             logger.info("Setting up ChromeDriver...")
             driver_path = ChromeDriverManager().install()
@@ -93,14 +133,31 @@ class LeadAgent:
         """
         Create Selenium WebDriver with Chrome options
         """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
         chrome_options = Options()
-        # chrome_options.add_argument("--headless")  # Uncomment for headless mode
+        if self.config.get('headless_mode'):
+            chrome_options.add_argument("--headless=new")
+        
+        # Reuse a persistent profile so logins survive browser restarts
+        profile_dir = self.config.get('chrome_profile_dir')
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+        
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("start-maximized")
         chrome_options.add_argument("--disable-notifications")
         
+        if self.config.get('network_capture', {}).get('enabled'):
+            network_capture.enable_capture(chrome_options)
+        
+        if self.chrome_driver_path is None:
+            self.chrome_driver_path = self.setup_chromedriver()
+        
         try:
             service = Service(self.chrome_driver_path)
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -110,135 +167,343 @@ class LeadAgent:
             logger.error(f"Error creating Chrome driver: {e}")
             raise
     
-    def extract_leads_facebook(self):
+    def quit_driver(self):
+        """
+        Close Chrome if it is running; a dead session is just dropped
+        """
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+            logger.info("Chrome driver closed")
+        except Exception as e:
+            logger.warning(f"Error closing Chrome driver: {e}")
+        self.driver = None
+    
+    def listing_url(self, platform, city=None, page=1):
+        """
+        Listing page URL for a platform, optionally for one city
+        City URLs come from extraction_settings.<platform>.city_url, later
+        result pages from page_url (platforms without it have one page)
+        """
+        default_urls = {
+            "facebook": "https://www.facebook.com/marketplace",
+            "olx_webstore": "https://www.olx.in/autos/cars/",
+        }
+        settings = self.config.get('extraction_settings', {}).get(platform, {})
+        if page > 1 and city and settings.get('page_url'):
+            return settings['page_url'].format(city=city, page=page)
+        if city and settings.get('city_url'):
+            return settings['city_url'].format(city=city)
+        return default_urls[platform]
+    
+    def extract_platform(self, platform, city=None, page=1):
+        """
+        Extract leads for one configured platform name
+        """
+        if platform == "facebook":
+            return self.extract_leads_facebook(city, page)
+        if platform == "olx_webstore":
+            return self.extract_leads_olx_webstore(city, page)
+        logger.warning(f"Unknown platform: {platform}")
+        return []
+    
+    def extract_leads_facebook(self, city=None, page=1):
         """
         Extract leads from Facebook Marketplace
-        Returns list of lead dictionaries
+        Returns list of Lead records
         """
         logger.info("Starting Facebook Marketplace lead extraction")
         leads = []
         
         try:
             # Navigate to Facebook (manual login required)
-            self.driver.get("https://www.facebook.com/marketplace")
+            self.reset_capture()
+            self.driver.get(self.listing_url("facebook", city, page))
             logger.info("Navigated to Facebook Marketplace")
             
-            # Wait for user to manually login and load marketplace
-            input("Please login to Facebook and open desired marketplace listings. Press Enter when ready...")
-            
-            # Extract listing information
-            listings = self.driver.find_elements(By.CSS_SELECTOR, "[role='article']")
+            # Interactive runs may need a manual login first: keep waiting
+            # until the listings render instead of asking for Enter
+            if self.interactive:
+                logger.info("Log in to Facebook in the browser window if asked; extraction starts when listings appear")
+            listings = self.wait_for_listings("facebook", "[role='article']", login=self.interactive)
+            if self.stop_event.is_set():
+                # Left unfinished in the journal for the next start
+                return leads
             logger.info(f"Found {len(listings)} listings")
+            listings = listings[:self.max_listings("facebook")]
+            self.record_snapshot("facebook", listings, city)
             
-            for listing in listings[:10]:  # Process first 10 listings
-                try:
-                    lead_data = self.parse_facebook_listing(listing)
-                    if lead_data:
-                        leads.append(lead_data)
-                        logger.info(f"Extracted lead: {lead_data.get('phone')}")
-                except Exception as e:
-                    logger.warning(f"Error parsing Facebook listing: {e}")
-                    continue
+            # Skip cards already journaled by an interrupted run
+            start = self.resume_position("facebook")
+            cards = self.capture_cards("facebook", city, start)
+            if cards is None:
+                # No API response captured: read the rendered cards instead
+                cards = []
+                for index, listing in enumerate(listings):
+                    if index < start:
+                        continue
+                    card = self.read_facebook_card(listing)
+                    if card:
+                        card["city"] = city
+                        cards.append((index, card))
+            
+            self.fetch_details("facebook", cards)
+            leads = self.enrich_and_checkpoint("facebook", cards)
+            for lead in leads:
+                logger.info(f"Extracted lead: {lead.phone}")
+            
+            if self.journal:
+                self.journal.mark_platform_done("facebook")
         
         except Exception as e:
             logger.error(f"Error extracting Facebook leads: {e}")
+            if is_browser_error(e):
+                raise
         
         return leads
     
-    def parse_facebook_listing(self, listing_element):
+    def wait_for_listings(self, platform, selector, login=False):
         """
-        Parse individual Facebook listing element
+        Wait until the listing cards on the current page are rendered and stable
+        Timeouts come from extraction_settings.<platform>.wait_timeout
+        (login_timeout while a manual login may be in progress)
+        """
+        settings = self.config.get('extraction_settings', {}).get(platform, {})
+        timeout = settings.get('wait_timeout', 10)
+        if login:
+            timeout = max(timeout, settings.get('login_timeout', 300))
+        return wait_for_cards(self.driver, selector, timeout=timeout,
+                              settle_ms=settings.get('settle_ms', 500), stop_event=self.stop_event)
+    
+    def record_snapshot(self, platform, listings, city=None):
+        """
+        Save the card HTML of the current page to the snapshot archive
+        Enabled with snapshots.enabled in config.json
+        """
+        settings = self.config.get('snapshots', {})
+        if not settings.get('enabled'):
+            return
+        
+        try:
+            if self.snapshots is None:
+                self.snapshots = SnapshotArchive(settings.get('path', 'snapshots/pages'))
+            cards = [listing.get_attribute("outerHTML") for listing in listings]
+            self.snapshots.append(platform, self.driver.current_url, cards, city)
+        except Exception as e:
+            logger.warning(f"Error recording page snapshot: {e}")
+    
+    def resume_position(self, platform):
+        """
+        First card index to process for a platform (non-zero when resuming)
+        """
+        return self.journal.resume_position(platform) if self.journal else 0
+    
+    def reset_capture(self):
+        """
+        Forget captured responses of earlier pages before navigating
+        """
+        if self.config.get('network_capture', {}).get('enabled'):
+            network_capture.reset_capture(self.driver)
+    
+    def max_listings(self, platform):
+        """
+        Listings read per page (extraction_settings.<platform>.max_listings),
+        the same for network capture, page elements and snapshots
+        """
+        return self.config.get('extraction_settings', {}).get(platform, {}).get('max_listings', 20)
+    
+    def capture_cards(self, platform, city=None, start=0):
+        """
+        (card_index, card) pairs parsed from the listing API responses the
+        current page loaded; None when network capture is off or caught
+        nothing, so the caller falls back to the DOM
+        """
+        if not self.config.get('network_capture', {}).get('enabled'):
+            return None
+        
+        captured = network_capture.captured_cards(self.driver, platform)
+        if not captured:
+            logger.info(f"No {platform} listing responses captured, using page elements")
+            return None
+        
+        cards = []
+        for index, card in enumerate(captured[:self.max_listings(platform)]):
+            if index < start:
+                continue
+            card["city"] = city
+            card["extracted_date"] = datetime.now().isoformat()
+            cards.append((index, card))
+        logger.info(f"Read {len(captured)} {platform} listings from network responses")
+        return cards
+    
+    def fetch_details(self, platform, indexed_cards):
+        """
+        Merge description/seller/parameters from each card's detail page
+        into the raw cards, loading up to detail_pages.tabs pages at once
+        """
+        settings = self.config.get('detail_pages', {})
+        if not settings.get('enabled') or not indexed_cards:
+            return
+        
+        selectors = self.config.get('extraction_settings', {}).get(platform, {}).get(
+            'detail_selectors', DEFAULT_SELECTORS[platform])
+        try:
+            fetcher = DetailFetcher(self.driver, tabs=settings.get('tabs', 4),
+                                    timeout=settings.get('timeout', 15))
+            # Cards read from API responses usually carry the description already
+            urls = [card.get('url') for _, card in indexed_cards if not card.get('description')]
+            details = fetcher.fetch(urls, selectors)
+        except Exception as e:
+            logger.error(f"Error fetching detail pages: {e}")
+            if is_browser_error(e):
+                raise
+            return
+        for _, card in indexed_cards:
+            merge_details(card, details.get(card.get('url')))
+    
+    def enrich_and_checkpoint(self, platform, indexed_cards):
+        """
+        Enrich (card_index, card) pairs and journal each resulting lead
+        """
+        leads = self.enricher.enrich([card for _, card in indexed_cards])
+        if self.journal:
+            for (index, _), lead in zip(indexed_cards, leads):
+                self.journal.record_lead(lead, platform, index)
+        return leads
+    
+    @staticmethod
+    def read_card_url(listing_element):
+        """
+        Listing URL from the card's first link, None if it has none
+        Tracking parameters are dropped so the same listing keeps one URL
+        """
+        try:
+            return canonical_url(listing_element.find_element(CSS_SELECTOR, "a[href]").get_attribute("href"))
+        except Exception:
+            return None
+    
+    @staticmethod
+    def read_facebook_card(listing_element):
+        """
+        Read raw text fields from a Facebook listing element
+        Works on live Selenium elements and on html_card elements (replay)
         """
         try:
-            title = listing_element.find_element(By.CSS_SELECTOR, "h2").text
-            price = listing_element.find_element(By.CSS_SELECTOR, "span[class*='price']").text
-            seller_info = listing_element.find_element(By.CSS_SELECTOR, "[class*='seller']").text
-            
             return {
                 "platform": "Facebook",
-                "title": title,
-                "price": price,
-                "seller_name": seller_info,
-                "phone": extract_phone(seller_info),
-                "year": extract_year(title),
-                "km": extract_km(title),
-                "brand": extract_brand(title),
-                "is_owner": is_owner(seller_info),
+                "source": "Facebook Marketplace",
+                "title": listing_element.find_element(CSS_SELECTOR, "h2").text,
+                "price": listing_element.find_element(CSS_SELECTOR, "span[class*='price']").text,
+                "seller_info": listing_element.find_element(CSS_SELECTOR, "[class*='seller']").text,
+                "url": LeadAgent.read_card_url(listing_element),
                 "extracted_date": datetime.now().isoformat(),
-                "source": "Facebook Marketplace"
             }
         except Exception as e:
             logger.warning(f"Error parsing listing: {e}")
+            if is_browser_error(e):
+                raise
             return None
     
-    def extract_leads_olx_webstore(self):
+    def parse_facebook_listing(self, listing_element):
+        """
+        Parse individual Facebook listing element
+        """
+        card = self.read_facebook_card(listing_element)
+        return enrich_card(card) if card else None
+    
+    def extract_leads_olx_webstore(self, city=None, page=1):
         """
         Extract leads from OLX WebStore
-        Returns list of lead dictionaries
+        Returns list of Lead records
         """
         logger.info("Starting OLX WebStore lead extraction")
         leads = []
         
         try:
             # Navigate to OLX WebStore
-            self.driver.get("https://www.olx.in/autos/cars/")
+            self.reset_capture()
+            self.driver.get(self.listing_url("olx_webstore", city, page))
             logger.info("Navigated to OLX Cars section")
             
-            # Wait for user interaction if needed
-            time.sleep(2)
-            
-            # Extract listings
-            listings = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='ad-card']")
+            listings = self.wait_for_listings("olx_webstore", "[data-testid='ad-card']")
+            if self.stop_event.is_set():
+                return leads
             logger.info(f"Found {len(listings)} OLX listings")
+            listings = listings[:self.max_listings("olx_webstore")]
+            self.record_snapshot("olx_webstore", listings, city)
             
-            for listing in listings[:10]:  # Process first 10 listings
-                try:
-                    lead_data = self.parse_olx_listing(listing)
-                    if lead_data:
-                        leads.append(lead_data)
-                        logger.info(f"Extracted OLX lead: {lead_data.get('phone')}")
-                except Exception as e:
-                    logger.warning(f"Error parsing OLX listing: {e}")
-                    continue
+            # Skip cards already journaled by an interrupted run
+            start = self.resume_position("olx_webstore")
+            cards = self.capture_cards("olx_webstore", city, start)
+            if cards is None:
+                # No API response captured: read the rendered cards instead
+                cards = []
+                for index, listing in enumerate(listings):
+                    if index < start:
+                        continue
+                    card = self.read_olx_card(listing)
+                    if card:
+                        card["city"] = city
+                        cards.append((index, card))
+            
+            self.fetch_details("olx_webstore", cards)
+            leads = self.enrich_and_checkpoint("olx_webstore", cards)
+            for lead in leads:
+                logger.info(f"Extracted OLX lead: {lead.phone}")
+            
+            if self.journal:
+                self.journal.mark_platform_done("olx_webstore")
         
         except Exception as e:
             logger.error(f"Error extracting OLX leads: {e}")
+            if is_browser_error(e):
+                raise
         
         return leads
     
-    def parse_olx_listing(self, listing_element):
+    @staticmethod
+    def read_olx_card(listing_element):
         """
-        Parse individual OLX listing element
+        Read raw text fields from an OLX listing element
+        Works on live Selenium elements and on html_card elements (replay)
         """
         try:
             # Extract listing details
-            title = listing_element.find_element(By.CSS_SELECTOR, "span[class*='title']").text
+            title = listing_element.find_element(CSS_SELECTOR, "span[class*='title']").text
             
             try:
-                price = listing_element.find_element(By.CSS_SELECTOR, "span[class*='price']").text
+                price = listing_element.find_element(CSS_SELECTOR, "span[class*='price']").text
             except:
                 price = "N/A"
             
             try:
-                location = listing_element.find_element(By.CSS_SELECTOR, "span[class*='location']").text
+                location = listing_element.find_element(CSS_SELECTOR, "span[class*='location']").text
             except:
                 location = "N/A"
             
             return {
                 "platform": "OLX WebStore",
+                "source": "OLX WebStore",
                 "title": title,
                 "price": price,
                 "location": location,
-                "year": extract_year(title),
-                "km": extract_km(title),
-                "brand": extract_brand(title),
+                "url": LeadAgent.read_card_url(listing_element),
                 "extracted_date": datetime.now().isoformat(),
-                "source": "OLX WebStore"
             }
         except Exception as e:
             logger.warning(f"Error parsing OLX listing: {e}")
+            if is_browser_error(e):
+                raise
             return None
     
+    def parse_olx_listing(self, listing_element):
+        """
+        Parse individual OLX listing element
+        """
+        card = self.read_olx_card(listing_element)
+        return enrich_card(card) if card else None
+    
     def send_to_sheets(self, lead):
         """
         Send lead data to Google Sheets via webhook
@@ -247,29 +512,16 @@ class LeadAgent:
             logger.warning("Webhook URL not configured")
             return False
         
+        import requests
+        
         try:
             # Prepare data according to Google Sheets columns
-            payload = {
-                "DATE": lead.get('extracted_date', datetime.now().isoformat()),
-                "NAME": lead.get('seller_name', 'N/A'),
-                "MOBILE": lead.get('phone', 'N/A'),
-                "REG_NO": lead.get('reg_no', 'N/A'),
-                "CAR_MODEL": lead.get('brand', 'N/A'),
-                "VARIANT": lead.get('variant', 'N/A'),
-                "YEAR": lead.get('year', 'N/A'),
-                "KM": lead.get('km', 'N/A'),
-                "ADDRESS": lead.get('location', 'N/A'),
-                "FOLLOW_UP": "Pending",
-                "SOURCE": lead.get('source', 'N/A'),
-                "CONTEXT": f"Owner: {lead.get('is_owner', 'N/A')}",
-                "LICENSE": "Verified",
-                "REMARK": lead.get('title', 'N/A')
-            }
+            payload = lead.to_sheet_payload()
             
             response = requests.post(self.webhook_url, json=payload, timeout=10)
             
             if response.status_code in [200, 201]:
-                logger.info(f"Lead sent to sheets successfully: {lead.get('phone')}")
+                logger.info(f"Lead sent to sheets successfully: {lead.phone}")
                 return True
             else:
                 logger.warning(f"Failed to send lead: {response.status_code}")
@@ -279,42 +531,266 @@ class LeadAgent:
             logger.error(f"Error sending lead to sheets: {e}")
             return False
     
+    def sync_to_sheets(self, leads, keys=None):
+        """
+        Send leads through the incremental sheet sync (batched, changed rows only)
+        keys: the leads' stored lead keys (default lead.key)
+        Returns True on success
+        """
+        if not self.webhook_url:
+            logger.warning("Webhook URL not configured")
+            return False
+        
+        settings = self.config.get('sheets_sync', {})
+        conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+        try:
+            syncer = SheetSync(conn, self.webhook_url, batch_size=settings.get('batch_size', 200))
+            keys = keys or [lead.key for lead in leads]
+            inserted, updated = syncer.sync(
+                (key, lead.to_sheet_payload()) for key, lead in zip(keys, leads)
+            )
+            logger.info(f"Synced to sheets: {inserted} new rows, {updated} updated rows")
+            return True
+        except Exception as e:
+            logger.error(f"Error syncing leads to sheets: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def save_leads(self, leads):
+        """
+        Store leads in the local SQLite database and schedule their follow-ups
+        Returns True on success
+        """
+        if not leads:
+            return True
+        
+        try:
+            conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+            followups.ensure_schema(conn)
+            followup_days = self.config.get('messaging', {}).get('followup_days', 3)
+            try:
+                with conn:
+                    for lead in leads:
+                        due = datetime.now() + timedelta(days=followup_days)
+                        lead.follow_up = due.date().isoformat()
+                        lead_id = lead_store.insert_lead(conn, lead)
+                        followups.add_followup(
+                            conn, lead_id, due.timestamp(),
+                            f"{lead.title or 'Lead'} - {lead.phone or 'no phone'} ({lead.platform})"
+                        )
+            finally:
+                conn.close()
+            logger.info(f"Saved {len(leads)} leads to database")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving leads to database: {e}")
+            return False
+    
+    def record_delivery(self, sent, failed):
+        """
+        Store the Sheets delivery outcome of lead keys (feeds the analytics)
+        """
+        if not sent and not failed:
+            return
+        try:
+            conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+            try:
+                with conn:
+                    lead_store.set_delivery(conn, sent, "sent")
+                    lead_store.set_delivery(conn, failed, "failed")
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Error recording delivery status: {e}")
+    
+    def filter_new_leads(self, leads):
+        """
+        Leads whose key is not in the database yet (first of each key only)
+        """
+        if not leads:
+            return []
+        conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+        try:
+            known = lead_store.known_keys(conn, (lead.key for lead in leads))
+        finally:
+            conn.close()
+        
+        new_leads = []
+        seen = set(known)
+        for lead in leads:
+            if lead.key not in seen:
+                seen.add(lead.key)
+                new_leads.append(lead)
+        return new_leads
+    
+    def sent_keys(self, keys):
+        """
+        Lead keys the database records as delivered to Google Sheets
+        """
+        keys = list(keys)
+        if not keys:
+            return set()
+        conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+        try:
+            return lead_store.known_keys(conn, keys, delivery="sent")
+        finally:
+            conn.close()
+    
+    def deliver_new_leads(self, leads):
+        """
+        Store and send only leads whose key is not in the database yet
+        Returns the number of new leads
+        """
+        new_leads = self.filter_new_leads(leads)
+        if new_leads and self.save_leads(new_leads):
+            self.deliver_leads(new_leads)
+        return len(new_leads)
+    
+    def deliver_leads(self, leads, on_sent=None, keys=None):
+        """
+        Send leads to Google Sheets: one batched incremental sync when
+        sheets_sync.enabled, else one webhook call per lead
+        on_sent(key) is called for every lead as soon as it is delivered
+        keys: the leads' stored lead keys (default lead.key)
+        Returns (sent keys, failed keys), also recorded in the database
+        """
+        keys = keys or [lead.key for lead in leads]
+        sent = []
+        failed = []
+        if self.config.get('sheets_sync', {}).get('enabled'):
+            if self.sync_to_sheets(leads, keys):
+                sent = list(keys)
+                for key in sent:
+                    if on_sent:
+                        on_sent(key)
+            else:
+                failed = list(keys)
+        else:
+            for key, lead in zip(keys, leads):
+                if self.stop_event.is_set():
+                    logger.info("Stop requested, remaining leads are sent on the next start")
+                    break
+                if self.send_to_sheets(lead):
+                    sent.append(key)
+                    if on_sent:
+                        on_sent(key)
+                else:
+                    failed.append(key)
+                self.stop_event.wait(self.config.get('message_delay', 2))
+        self.record_delivery(sent, failed)
+        return sent, failed
+    
+    def deliver_undelivered(self, batch_size=200):
+        """
+        Send stored leads whose delivery is 'pending' or 'failed' (a send
+        that failed, or a crash between storing and sending), oldest first
+        Stops at the first batch with a failure; the rest is retried on the
+        next call. Returns the number of leads sent
+        """
+        if not self.webhook_url:
+            return 0
+        
+        total = 0
+        last_id = 0
+        conn = lead_store.connect(self.config.get('database', lead_store.DEFAULT_DB_PATH))
+        try:
+            while not self.stop_event.is_set():
+                rows = lead_store.undelivered_leads(conn, last_id, batch_size)
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                leads = [Lead.from_db_row(row) for row in rows]
+                keys = [row["lead_key"] or lead.key for row, lead in zip(rows, leads)]
+                sent, failed = self.deliver_leads(leads, keys=keys)
+                total += len(sent)
+                if failed:
+                    logger.warning(f"{len(failed)} stored leads not delivered, retrying later")
+                    break
+        finally:
+            conn.close()
+        if total:
+            logger.info(f"Delivered {total} stored leads left over from earlier attempts")
+        return total
+    
+    def stop(self):
+        """
+        Ask a running run() to finish early; safe to call from another thread
+        Extraction stops at the next page wait or platform, leads read so far
+        are stored and the rest stays in the run journal for the next start
+        """
+        self.stop_event.set()
+    
     def run(self):
         """
         Main execution function
         """
         try:
-            self.create_driver()
-            all_leads = []
+            # Reload an interrupted run, if any, so finished work is skipped
+            self.journal = RunJournal(self.config.get('checkpoint_dir', 'checkpoints')).open()
+            platforms = self.config.get('platforms', [])
             
-            # Extract from configured platforms
-            if "facebook" in self.config.get('platforms', []):
-                fb_leads = self.extract_leads_facebook()
-                all_leads.extend(fb_leads)
+            # Extract from configured platforms; a browser failure leaves the
+            # platform unfinished for the next start and gets a fresh browser
+            for platform in ("facebook", "olx_webstore"):
+                if self.stop_event.is_set():
+                    logger.info("Stop requested, skipping remaining platforms")
+                    break
+                if platform not in platforms or platform in self.journal.done_platforms:
+                    continue
+                try:
+                    if not self.driver:
+                        self.create_driver()
+                    self.extract_platform(platform)
+                except Exception as e:
+                    logger.error(f"Browser failed during {platform} extraction: {e}")
+                    self.quit_driver()
             
-            if "olx_webstore" in self.config.get('platforms', []):
-                olx_leads = self.extract_leads_olx_webstore()
-                all_leads.extend(olx_leads)
+            # Listings already in the database (an earlier run, or a crash
+            # between saving and journaling) are not stored again; only
+            # those the database records as sent skip delivery
+            pending = self.journal.pending_store()
+            new_keys = {lead.key for lead in self.filter_new_leads(pending)}
+            known = [lead.key for lead in pending if lead.key not in new_keys]
+            self.journal.mark_stored(known)
+            for key in self.sent_keys(known):
+                self.journal.mark_delivered(key)
+            pending = [lead for lead in pending if lead.key in new_keys]
+            if self.save_leads(pending):
+                self.journal.mark_stored([lead.key for lead in pending])
             
-            # Send all leads to Google Sheets
-            for lead in all_leads:
-                self.send_to_sheets(lead)
-                time.sleep(self.config.get('message_delay', 2))
+            # Send leads not yet delivered to Google Sheets
+            self.deliver_leads(self.journal.pending_delivery(), on_sent=self.journal.mark_delivered)
             
-            logger.info(f"Processed {len(all_leads)} total leads")
+            logger.info(f"Processed {len(self.journal.leads)} total leads")
+            
+            # Keep the journal for the next start unless nothing is left over
+            unfinished = [p for p in platforms if p in ("facebook", "olx_webstore")
+                          and p not in self.journal.done_platforms]
+            if unfinished or self.journal.pending_store() or self.journal.pending_delivery():
+                logger.warning(
+                    f"Run incomplete (platforms left: {unfinished or 'none'}, "
+                    f"unstored: {len(self.journal.pending_store())}, "
+                    f"undelivered: {len(self.journal.pending_delivery())}); next start resumes it"
+                )
+            else:
+                self.journal.complete()
         
         except Exception as e:
             logger.error(f"Error in main execution: {e}")
         
         finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("Chrome driver closed")
+            self.quit_driver()
+            self.enricher.close()
+            if self.journal:
+                self.journal.close()
 
 def main():
     """
     Entry point
     """
+    multiprocessing.freeze_support()
+    setup_logging()
     agent = LeadAgent()
     agent.run()
 
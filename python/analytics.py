@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incrementally maintained lead analytics
+Summary tables are updated by triggers on the leads table, i.e. inside the
+same transaction as every insert, update or delete, so the dashboard reads
+a handful of small rows instead of running GROUP BYs over all leads
+
+Usage:
+    python analytics.py            # print the current summary
+"""
+
+import sys
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# dimension name -> SQL expression over the trigger row ({row} = new/old)
+DIMENSIONS = [
+    ("platform", "coalesce({row}.platform, 'unknown')"),
+    ("city", "coalesce({row}.city, 'unknown')"),
+    ("brand", "coalesce({row}.brand, 'unknown')"),
+    ("day", "coalesce(substr({row}.date, 1, 10), 'unknown')"),
+    ("owner", "CASE {row}.is_owner WHEN 1 THEN 'owner' WHEN 0 THEN 'dealer' ELSE 'unknown' END"),
+    ("delivery", "coalesce({row}.delivery, 'pending')"),
+    ("status", "coalesce({row}.status, 'new')"),
+]
+
+# metric name -> bucket expression; buckets keep medians O(buckets), not O(leads)
+HISTOGRAMS = [
+    ("year", "CAST({row}.year AS INTEGER)"),
+    ("km", "CAST({row}.km AS INTEGER) / 1000 * 1000"),
+]
+
+TRIGGER_COLUMNS = "platform, city, brand, date, is_owner, delivery, status, year, km"
+
+def _apply_statements(row, delta):
+    statements = []
+    for name, expr in DIMENSIONS:
+        statements.append(
+            f"INSERT INTO lead_stats (dimension, value, leads) VALUES ('{name}', {expr.format(row=row)}, {delta}) "
+            f"ON CONFLICT (dimension, value) DO UPDATE SET leads = leads + ({delta});"
+        )
+    for name, expr in HISTOGRAMS:
+        statements.append(
+            f"INSERT INTO lead_histogram (metric, bucket, leads) "
+            f"SELECT '{name}', {expr.format(row=row)}, {delta} WHERE {row}.{name} IS NOT NULL "
+            f"ON CONFLICT (metric, bucket) DO UPDATE SET leads = leads + ({delta});"
+        )
+    return "\n".join(statements)
+
+def ensure_schema(conn):
+    """
+    Create the summary tables and triggers; backfill from existing leads once
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'lead_stats_insert'"
+    ).fetchone()
+    if exists:
+        return
+
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS lead_stats (
+                dimension TEXT,
+                value TEXT,
+                leads INTEGER,
+                PRIMARY KEY (dimension, value)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS lead_histogram (
+                metric TEXT,
+                bucket INTEGER,
+                leads INTEGER,
+                PRIMARY KEY (metric, bucket)
+            )
+        ''')
+        conn.execute(f"""
+            CREATE TRIGGER lead_stats_insert AFTER INSERT ON leads BEGIN
+                {_apply_statements('new', 1)}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER lead_stats_delete AFTER DELETE ON leads BEGIN
+                {_apply_statements('old', -1)}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER lead_stats_update AFTER UPDATE OF {TRIGGER_COLUMNS} ON leads BEGIN
+                {_apply_statements('old', -1)}
+                {_apply_statements('new', 1)}
+            END
+        """)
+        rebuild(conn)
+
+def rebuild(conn):
+    """
+    Recompute the summary tables from scratch (one full scan)
+    Caller is responsible for committing
+    """
+    logger.info("Rebuilding lead analytics")
+    conn.execute("DELETE FROM lead_stats")
+    conn.execute("DELETE FROM lead_histogram")
+    for name, expr in DIMENSIONS:
+        value = expr.format(row="leads")
+        conn.execute(
+            f"INSERT INTO lead_stats (dimension, value, leads) "
+            f"SELECT '{name}', {value}, count(*) FROM leads GROUP BY {value}"
+        )
+    for name, expr in HISTOGRAMS:
+        bucket = expr.format(row="leads")
+        conn.execute(
+            f"INSERT INTO lead_histogram (metric, bucket, leads) "
+            f"SELECT '{name}', {bucket}, count(*) FROM leads WHERE leads.{name} IS NOT NULL GROUP BY {bucket}"
+        )
+
+def _median(conn, metric):
+    rows = conn.execute(
+        "SELECT bucket, leads FROM lead_histogram WHERE metric = ? AND leads > 0 ORDER BY bucket",
+        (metric,)
+    ).fetchall()
+    total = sum(row[1] for row in rows)
+    if not total:
+        return None
+    middle = (total + 1) // 2
+    seen = 0
+    for bucket, leads in rows:
+        seen += leads
+        if seen >= middle:
+            return bucket
+    return None
+
+def _stats(conn, dimensions=None):
+    """
+    {dimension: {value: leads}} for all or only the given dimensions
+    """
+    query = "SELECT dimension, value, leads FROM lead_stats WHERE leads > 0"
+    params = []
+    if dimensions:
+        query += f" AND dimension IN ({', '.join('?' for _ in dimensions)})"
+        params = list(dimensions)
+    stats = {}
+    for dimension, value, leads in conn.execute(query + " ORDER BY dimension, leads DESC", params):
+        stats.setdefault(dimension, {})[value] = leads
+    return stats
+
+def _totals(conn, stats):
+    owners = stats.get("owner", {})
+    delivery = stats.get("delivery", {})
+    known_owner = owners.get("owner", 0) + owners.get("dealer", 0)
+    return {
+        "total": sum(stats.get("platform", {}).values()),
+        "per_platform": stats.get("platform", {}),
+        "owner": owners.get("owner", 0),
+        "dealer": owners.get("dealer", 0),
+        "owner_ratio": owners.get("owner", 0) / known_owner if known_owner else None,
+        "delivered": delivery.get("sent", 0),
+        "delivery_failed": delivery.get("failed", 0),
+        "delivery_pending": delivery.get("pending", 0),
+        "median_year": _median(conn, "year"),
+        "median_km": _median(conn, "km"),
+    }
+
+def totals(conn):
+    """
+    Headline numbers only (total, platform, owner/dealer, delivery,
+    medians); reads a few fixed rows however long the history is
+    """
+    return _totals(conn, _stats(conn, ("platform", "owner", "delivery")))
+
+def summary(conn):
+    """
+    Dashboard numbers read from the summary tables, including the full
+    per-city, per-brand and per-day breakdowns
+    """
+    stats = _stats(conn)
+    result = _totals(conn, stats)
+    result.update({
+        "per_city": stats.get("city", {}),
+        "per_brand": stats.get("brand", {}),
+        "per_day": stats.get("day", {}),
+        "per_status": stats.get("status", {}),
+    })
+    return result
+
+def main():
+    """
+    Entry point
+    """
+    import lead_store
+
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    conn = lead_store.connect(config.get('database', lead_store.DEFAULT_DB_PATH))
+    try:
+        print(json.dumps(summary(conn), indent=2))
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,9 +36,12 @@ def main():
     
     # Build with PyInstaller
     print("[3/5] Building EXE with PyInstaller...")
+    # --onedir: a --onefile EXE unpacks every bundled library to a temp
+    # folder on each launch, which delays the GUI by several seconds
     build_cmd = [
         "pyinstaller",
-        "--onefile",
+        "--onedir",
+        "--noconfirm",
         "--windowed",
         "--name=FBLeadsAgent",
         "--icon=icon.ico" if Path("icon.ico").exists() else "",
@@ -74,7 +77,7 @@ def main():
     
     # Verify
     print("[5/5] Verifying EXE...")
-    exe_path = Path("dist/FBLeadsAgent.exe")
+    exe_path = Path("dist/FBLeadsAgent/FBLeadsAgent.exe")
     if exe_path.exists():
         size_mb = exe_path.stat().st_size / (1024*1024)
         print(f"\u2713 EXE ready: {exe_path} ({size_mb:.1f} MB)\n")
@@ -83,8 +86,8 @@ def main():
         print("="*60)
         print(f"\nEXE Location: {exe_path.absolute()}")
         print("\nInstallation Instructions:")
-        print("1. Copy FBLeadsAgent.exe to your PC")
-        print("2. Double-click to run")
+        print(f"1. Copy the whole {exe_path.parent} folder to your PC")
+        print("2. Double-click FBLeadsAgent.exe inside it to run")
         print("3. Configure webhook URL and select platforms")
         print("4. Click START AGENT\n")
         return True
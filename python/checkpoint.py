@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crash-safe checkpointing for agent runs
+Every extracted lead and delivery is appended to a journal on disk, and the
+current position (platform, card) is kept in a small run-state file, so an
+interrupted run can pick up where it stopped
+"""
+
+import os
+import json
+import uuid
+import logging
+from datetime import datetime
+from pathlib import Path
+from models import Lead
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'journal.jsonl'
+STATE_FILE = 'run_state.json'
+
+class RunJournal:
+    """
+    Append-only journal of one agent run plus its run-state record
+
+    Journal entries (one JSON object per line):
+        {"type": "lead", "key": ..., "platform": ..., "lead": {...}}
+        {"type": "stored", "keys": [...]}
+        {"type": "delivered", "key": ...}
+        {"type": "platform_done", "platform": ...}
+    """
+
+    def __init__(self, directory='checkpoints'):
+        self.directory = Path(directory)
+        self.journal_path = self.directory / JOURNAL_FILE
+        self.state_path = self.directory / STATE_FILE
+        self.state = {}
+        self.leads = {}
+        self.stored = set()
+        self.delivered = set()
+        self.done_platforms = set()
+        self._journal = None
+
+    @property
+    def resuming(self):
+        """
+        True when an unfinished run was found on disk
+        """
+        return self.state.get('status') == 'running'
+
+    def open(self):
+        """
+        Load any unfinished run and open the journal for appending
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+        if self.resuming:
+            logger.info(
+                f"Resuming run {self.state.get('run_id')}: {len(self.leads)} leads journaled, "
+                f"{len(self.delivered)} delivered, done platforms: {sorted(self.done_platforms) or 'none'}"
+            )
+        else:
+            # Previous run finished (or none yet): start a fresh journal
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self.state = {
+                "run_id": uuid.uuid4().hex,
+                "started_at": datetime.now().isoformat(),
+                "status": "running",
+                "platform": None,
+                "last_card": -1,
+            }
+            self._write_state()
+
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return self
+
+    def _load(self):
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable run state: {e}")
+                self.state = {}
+
+        if not self.resuming or not self.journal_path.exists():
+            return
+
+        # Drop a torn final line left by a crash mid-write so new entries
+        # are not glued onto it
+        with open(self.journal_path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    pos = pos - step + newline + 1
+                    break
+                pos -= step
+            if pos != end:
+                logger.warning("Dropping truncated journal entry")
+                f.truncate(pos)
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable journal entry")
+                    continue
+                kind = entry.get('type')
+                if kind == 'lead':
+                    self.leads[entry['key']] = Lead.from_dict(entry['lead'])
+                elif kind == 'stored':
+                    self.stored.update(entry['keys'])
+                elif kind == 'delivered':
+                    self.delivered.add(entry['key'])
+                elif kind == 'platform_done':
+                    self.done_platforms.add(entry['platform'])
+
+    def _append(self, entry):
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _write_state(self):
+        # Write-then-rename so a crash never leaves a half-written state file
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def resume_position(self, platform):
+        """
+        Index of the first card still to be processed for a platform
+        """
+        if self.state.get('platform') == platform:
+            return self.state.get('last_card', -1) + 1
+        return 0
+
+    def update_state(self, **fields):
+        """
+        Record run state fields (current platform, last card index, status)
+        """
+        self.state.update(fields)
+        self._write_state()
+
+    def record_lead(self, lead, platform, card_index):
+        """
+        Journal one extracted lead and advance the card position
+        Returns False when the lead was already journaled
+        """
+        key = lead.key
+        is_new = key not in self.leads
+        if is_new:
+            self.leads[key] = lead
+            self._append({"type": "lead", "key": key, "platform": platform, "lead": lead.to_dict()})
+        self.update_state(platform=platform, last_card=card_index)
+        return is_new
+
+    def mark_stored(self, keys):
+        keys = [key for key in keys if key not in self.stored]
+        if keys:
+            self.stored.update(keys)
+            self._append({"type": "stored", "keys": keys})
+
+    def mark_delivered(self, key):
+        self.delivered.add(key)
+        self._append({"type": "delivered", "key": key})
+
+    def mark_platform_done(self, platform):
+        self.done_platforms.add(platform)
+        self._append({"type": "platform_done", "platform": platform})
+        self.update_state(platform=None, last_card=-1)
+
+    def pending_store(self):
+        return [lead for key, lead in self.leads.items() if key not in self.stored]
+
+    def pending_delivery(self):
+        return [lead for key, lead in self.leads.items() if key not in self.delivered]
+
+    def complete(self):
+        """
+        Mark the run finished; the next run starts with a fresh journal
+        """
+        self.update_state(status="complete", finished_at=datetime.now().isoformat())
+        self.close()
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-node sweeps over a shared SQLite work queue
+The coordinator splits each sweep into (platform, city, page) jobs, workers
+on any number of hosts lease jobs, run the normal extractors and write the
+leads back; the coordinator then dedups and stores them centrally and sends
+every stored lead not yet in the sheet
+
+A lease is kept alive by the worker's heartbeat. When a worker dies its
+leases expire and the jobs are handed to the next worker; a job whose
+browser fails is put back in the queue and the worker starts a new browser.
+Leads are only marked collected after they are stored, and stay 'pending'
+in leads.db until they reach the sheet, so no job or lead is lost
+
+Put the queue file on a volume every node can reach (e.g. an SMB/NFS share
+with working file locks); it is used in rollback-journal mode because WAL
+does not work across hosts
+
+Usage:
+    python cluster.py coordinator          # on the machine that delivers leads
+    python cluster.py worker               # on every scraping machine
+    python cluster.py status
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import shutil
+import sqlite3
+import argparse
+import threading
+import logging
+from datetime import datetime
+import multiprocessing
+from models import Lead
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = 'queue.db'
+
+def connect(queue_path=DEFAULT_QUEUE_PATH):
+    """
+    Open the queue database (autocommit; writers use BEGIN IMMEDIATE)
+    """
+    conn = sqlite3.connect(queue_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout = 30000")
+    ensure_schema(conn)
+    return conn
+
+def ensure_schema(conn):
+    """
+    Create the jobs, workers and results tables
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            sweep TEXT,
+            platform TEXT,
+            city TEXT,
+            page INTEGER,
+            status TEXT DEFAULT 'queued',
+            worker TEXT,
+            lease_expires REAL,
+            attempts INTEGER DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            UNIQUE (sweep, platform, city, page)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id TEXT PRIMARY KEY,
+            host TEXT,
+            pid INTEGER,
+            started_at TIMESTAMP,
+            heartbeat_at REAL,
+            jobs_done INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            job_id INTEGER,
+            worker TEXT,
+            lead TEXT,
+            created_at TIMESTAMP,
+            collected INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_collected ON results (collected, id)")
+
+class WorkQueue:
+    """
+    Job queue with leases; every state change is one short write transaction
+    """
+
+    def __init__(self, conn, lease_seconds=120, max_attempts=3):
+        self.conn = conn
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _write(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never read the same queued job and both lease it
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue_sweep(self, jobs, sweep=None):
+        """
+        Queue (platform, city, page) jobs under one sweep id
+        Returns the sweep id
+        """
+        sweep = sweep or datetime.now().strftime("%Y%m%d-%H%M%S")
+        now = datetime.now().isoformat()
+        self._write()
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (sweep, platform, city, page, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(sweep, platform, city, page, now) for platform, city, page in jobs]
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return sweep
+
+    def claim(self, worker_id):
+        """
+        Lease the oldest queued job (or one whose lease expired)
+        Returns the job row or None
+        """
+        now = time.time()
+        self._write()
+        try:
+            job = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "OR (status = 'leased' AND lease_expires < ? AND attempts < ?) ORDER BY id LIMIT 1",
+                (now, self.max_attempts)
+            ).fetchone()
+            if job is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, job["id"])
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if job is None:
+            return None
+        return self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+
+    def heartbeat(self, worker_id, job_id=None):
+        """
+        Mark the worker alive and extend the lease of its current job
+        """
+        now = time.time()
+        self._write()
+        try:
+            self.conn.execute("UPDATE workers SET heartbeat_at = ? WHERE worker_id = ?", (now, worker_id))
+            if job_id is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                    (now + self.lease_seconds, job_id, worker_id)
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def register(self, worker_id):
+        self._write()
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, host, pid, started_at, heartbeat_at, jobs_done) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (worker_id, socket.gethostname(), os.getpid(), datetime.now().isoformat(), time.time())
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def complete(self, job_id, worker_id, leads):
+        """
+        Store a job's leads and mark it done in one transaction
+        Leads are kept even if the lease was lost meanwhile; the
+        coordinator's dedup drops the copies a second run may produce
+        """
+        now = datetime.now().isoformat()
+        self._write()
+        try:
+            self.conn.executemany(
+                "INSERT INTO results (job_id, worker, lead, created_at) VALUES (?, ?, ?, ?)",
+                [(job_id, worker_id, json.dumps(lead.to_dict()), now) for lead in leads]
+            )
+            self.conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, error = NULL WHERE id = ? AND status != 'done'",
+                (now, job_id)
+            )
+            self.conn.execute("UPDATE workers SET jobs_done = jobs_done + 1 WHERE worker_id = ?", (worker_id,))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Put a failed job back in the queue, or give up after max_attempts
+        """
+        self._write()
+        try:
+            self.conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "worker = NULL, lease_expires = NULL, error = ? WHERE id = ? AND worker = ?",
+                (self.max_attempts, str(error)[:500], job_id, worker_id)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def requeue_expired(self):
+        """
+        Return jobs of dead workers (expired leases) to the queue
+        Returns the number of jobs re-queued
+        """
+        self._write()
+        try:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "worker = NULL, lease_expires = NULL, error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, time.time())
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if cursor.rowcount:
+            logger.warning(f"Re-queued {cursor.rowcount} jobs with expired leases")
+        return cursor.rowcount
+
+    def uncollected(self, limit=500):
+        """
+        Returns (result_ids, leads) not yet taken over by the coordinator
+        """
+        rows = self.conn.execute(
+            "SELECT id, lead FROM results WHERE collected = 0 ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [row["id"] for row in rows], [Lead.from_dict(json.loads(row["lead"])) for row in rows]
+
+    def mark_collected(self, result_ids):
+        self._write()
+        try:
+            self.conn.executemany("UPDATE results SET collected = 1 WHERE id = ?", [(i,) for i in result_ids])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def pending_jobs(self, sweep=None):
+        """
+        Number of jobs not finished yet (optionally for one sweep)
+        """
+        query = "SELECT count(*) FROM jobs WHERE status IN ('queued', 'leased')"
+        params = []
+        if sweep:
+            query += " AND sweep = ?"
+            params.append(sweep)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def stats(self):
+        """
+        Job counts by status, live workers and uncollected results
+        """
+        jobs = {row[0]: row[1] for row in self.conn.execute("SELECT status, count(*) FROM jobs GROUP BY status")}
+        alive_after = time.time() - self.lease_seconds
+        workers = [dict(row) for row in self.conn.execute(
+            "SELECT worker_id, host, pid, heartbeat_at, jobs_done FROM workers WHERE heartbeat_at >= ? "
+            "ORDER BY worker_id", (alive_after,)
+        )]
+        uncollected = self.conn.execute("SELECT count(*) FROM results WHERE collected = 0").fetchone()[0]
+        return {"jobs": jobs, "workers": workers, "uncollected_results": uncollected}
+
+def sweep_jobs(config):
+    """
+    (platform, city, page) jobs for one full sweep from config.json
+    Only platforms with extraction_settings.<platform>.page_url get more
+    than one page per city
+    """
+    settings = config.get('cluster', {})
+    cities = settings.get('cities') or config.get('daemon', {}).get('cities') or [None]
+    pages = settings.get('pages', 1)
+    jobs = []
+    for platform in config.get('platforms', []):
+        platform_pages = pages if config.get('extraction_settings', {}).get(platform, {}).get('page_url') else 1
+        for city in cities:
+            for page in range(1, platform_pages + 1):
+                jobs.append((platform, city, page))
+    return jobs
+
+class Worker:
+    """
+    Lease jobs and run them on one warm browser until stopped
+    """
+
+    def __init__(self, agent, queue_path, worker_id=None):
+        settings = agent.config.get('cluster', {})
+        self.agent = agent
+        self.queue_path = queue_path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = settings.get('lease_seconds', 120)
+        self.heartbeat_seconds = settings.get('heartbeat_seconds', 30)
+        self.idle_seconds = settings.get('idle_seconds', 5)
+        self.max_attempts = settings.get('max_attempts', 3)
+        self.queue = None
+        self.current_job = None
+        self.stop_event = threading.Event()
+        profile_dir = agent.config.get('chrome_profile_dir')
+        if profile_dir:
+            agent.config['chrome_profile_dir'] = self.worker_profile(profile_dir)
+
+    def worker_profile(self, profile_dir):
+        """
+        Chrome profile of this worker: <chrome_profile_dir>-<worker id>
+        Two Chromes cannot open the same profile, so every worker gets its
+        own, copied from the logged-in profile the first time it starts
+        """
+        suffix = re.sub(r'[^A-Za-z0-9_.-]', '_', self.worker_id)
+        own_dir = f"{os.path.normpath(profile_dir)}-{suffix}"
+        if not os.path.exists(own_dir) and os.path.isdir(profile_dir):
+            logger.info(f"Copying Chrome profile {profile_dir} to {own_dir}")
+            try:
+                # Singleton* are the lock files of a Chrome that has the profile open
+                shutil.copytree(profile_dir, own_dir, ignore=shutil.ignore_patterns('Singleton*'))
+            except Exception as e:
+                logger.error(f"Could not copy Chrome profile, starting {own_dir} logged out: {e}")
+        return own_dir
+
+    def _heartbeat_loop(self):
+        # Own connection: sqlite3 connections stay on their thread
+        queue = WorkQueue(connect(self.queue_path), self.lease_seconds)
+        try:
+            while not self.stop_event.wait(self.heartbeat_seconds):
+                try:
+                    queue.heartbeat(self.worker_id, self.current_job)
+                except Exception as e:
+                    logger.warning(f"Heartbeat failed: {e}")
+        finally:
+            queue.conn.close()
+
+    def run_job(self, job):
+        """
+        Extract one (platform, city, page) job on the warm browser
+        """
+        if self.agent.driver is None:
+            self.agent.create_driver()
+        return self.agent.extract_platform(job["platform"], job["city"], job["page"])
+
+    def run_forever(self):
+        logger.info(f"Worker {self.worker_id} started on {self.queue_path}")
+        self.queue = WorkQueue(connect(self.queue_path), self.lease_seconds, self.max_attempts)
+        self.queue.register(self.worker_id)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        try:
+            while not self.stop_event.is_set():
+                job = self.queue.claim(self.worker_id)
+                if job is None:
+                    self.stop_event.wait(self.idle_seconds)
+                    continue
+
+                self.current_job = job["id"]
+                logger.info(f"Job {job['id']}: {job['platform']} {job['city'] or ''} page {job['page']}")
+                try:
+                    leads = self.run_job(job)
+                    self.queue.complete(job["id"], self.worker_id, leads)
+                    logger.info(f"Job {job['id']} done: {len(leads)} leads")
+                except Exception as e:
+                    # Browser failures propagate out of the extractors: the
+                    # job goes back to the queue instead of ending 'done'
+                    logger.error(f"Job {job['id']} failed: {e}")
+                    self.queue.fail(job["id"], self.worker_id, e)
+                    # A broken session is cheaper to replace than to debug
+                    self.agent.quit_driver()
+                finally:
+                    self.current_job = None
+        finally:
+            self.stop_event.set()
+            self.agent.quit_driver()
+            self.agent.enricher.close()
+            self.queue.conn.close()
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self.stop_event.set()
+
+class Coordinator:
+    """
+    Queue sweeps, recover jobs of dead workers, dedup and deliver leads
+    """
+
+    def __init__(self, agent, queue_path):
+        settings = agent.config.get('cluster', {})
+        self.agent = agent
+        self.interval = settings.get('interval_seconds', 600)
+        self.poll_seconds = settings.get('poll_seconds', 10)
+        self.queue_path = queue_path
+        self.lease_seconds = settings.get('lease_seconds', 120)
+        self.max_attempts = settings.get('max_attempts', 3)
+        self.batch_size = agent.config.get('sheets_sync', {}).get('batch_size', 200)
+        self.queue = None
+        self.stop_event = threading.Event()
+
+    def collect(self):
+        """
+        Move worker results into the lead store (dedup by lead key)
+        Results are marked collected only after they are stored, so a
+        coordinator crash re-collects them and the dedup drops the copies
+        Returns the number of new leads
+        """
+        new = 0
+        while True:
+            result_ids, leads = self.queue.uncollected()
+            if not result_ids:
+                return new
+            new_leads = self.agent.filter_new_leads(leads)
+            if not self.agent.save_leads(new_leads):
+                raise RuntimeError("Could not store collected leads")
+            self.queue.mark_collected(result_ids)
+            new += len(new_leads)
+
+    def deliver(self):
+        """
+        Send stored leads whose delivery is 'pending' or 'failed' the same
+        way a single-machine run does (batched sheet sync when
+        sheets_sync.enabled, one webhook post per lead otherwise)
+        Returns the number of leads sent
+        """
+        return self.agent.deliver_undelivered(self.batch_size)
+
+    def run_forever(self):
+        logger.info(f"Coordinator started on {self.queue_path}")
+        self.queue = WorkQueue(connect(self.queue_path), self.lease_seconds, self.max_attempts)
+        sweep = None
+        next_sweep = 0
+        try:
+            while not self.stop_event.is_set():
+                if time.time() >= next_sweep and (sweep is None or self.queue.pending_jobs(sweep) == 0):
+                    jobs = sweep_jobs(self.agent.config)
+                    sweep = self.queue.enqueue_sweep(jobs)
+                    next_sweep = time.time() + self.interval
+                    logger.info(f"Queued sweep {sweep}: {len(jobs)} jobs")
+                try:
+                    self.queue.requeue_expired()
+                    new = self.collect()
+                    if new:
+                        logger.info(f"Stored {new} new leads")
+                    sent = self.deliver()
+                    if sent:
+                        logger.info(f"Sent {sent} leads to the sheet")
+                except Exception as e:
+                    logger.error(f"Coordinator error: {e}")
+                self.stop_event.wait(self.poll_seconds)
+        finally:
+            self.queue.conn.close()
+            logger.info("Coordinator stopped")
+
+    def stop(self):
+        self.stop_event.set()
+        # Ends the send delays of a delivery in progress as well
+        self.agent.stop()
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Distribute platform/city sweeps over several machines")
+    parser.add_argument("role", choices=["coordinator", "worker", "status"])
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--queue", help="Queue database path (default: cluster.queue_path)")
+    parser.add_argument("--id", help="Worker id, also names its Chrome profile (default: host-pid)")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    queue_path = args.queue or config.get('cluster', {}).get('queue_path', DEFAULT_QUEUE_PATH)
+
+    if args.role == "status":
+        conn = connect(queue_path)
+        try:
+            print(json.dumps(WorkQueue(conn, config.get('cluster', {}).get('lease_seconds', 120)).stats(), indent=2))
+        finally:
+            conn.close()
+        return 0
+
+    from agent import LeadAgent, setup_logging
+
+    setup_logging()
+    agent = LeadAgent(args.config, interactive=False)
+    node = Coordinator(agent, queue_path) if args.role == "coordinator" else Worker(agent, queue_path, args.id)
+    try:
+        node.run_forever()
+    except KeyboardInterrupt:
+        node.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-running daemon mode
+Keeps one logged-in Chrome profile warm and re-polls every platform/city on
+an interval, recycling the browser when it grows too large
+
+Set chrome_profile_dir in config.json and log in to Facebook once with
+`python agent.py`; the daemon reuses that profile and never waits on input()
+
+Usage:
+    python daemon.py
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+import logging
+from datetime import datetime
+import multiprocessing
+from agent import LeadAgent, setup_logging
+
+logger = logging.getLogger(__name__)
+
+class LeadDaemon:
+    """
+    Poll loop around a LeadAgent whose browser stays open between polls
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+        settings = agent.config.get('daemon', {})
+        self.interval = settings.get('interval_seconds', 600)
+        self.jitter = settings.get('jitter_seconds', 60)
+        self.max_pages = settings.get('max_pages_per_browser', 200)
+        self.max_memory_mb = settings.get('max_browser_memory_mb', 1500)
+        self.health_file = settings.get('health_file', 'daemon_health.json')
+        self.cities = settings.get('cities') or [None]
+        self.platforms = agent.config.get('platforms', [])
+        self.stop_event = threading.Event()
+        self.pages_since_recycle = 0
+        self.status = {
+            "state": "starting",
+            "started_at": datetime.now().isoformat(),
+            "polls": 0,
+            "pages": 0,
+            "leads_new": 0,
+            "failed_pages": 0,
+            "failed_polls": 0,
+            "browser_restarts": 0,
+            "last_poll_at": None,
+            "last_poll_seconds": None,
+            "last_error": None,
+        }
+
+    def ensure_browser(self):
+        """
+        Start Chrome if it is not running (ChromeDriver was set up once by the agent)
+        """
+        if self.agent.driver is None:
+            self.agent.create_driver()
+            self.pages_since_recycle = 0
+
+    def browser_memory_mb(self):
+        """
+        Resident memory of Chrome and its child processes, None if unknown
+        Needs psutil (optional dependency)
+        """
+        try:
+            import psutil
+        except ImportError:
+            return None
+        try:
+            service_process = self.agent.driver.service.process
+            root = psutil.Process(service_process.pid)
+            processes = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def recycle_browser(self, reason):
+        logger.info(f"Recycling browser: {reason}")
+        self.agent.quit_driver()
+        self.status["browser_restarts"] += 1
+
+    def maybe_recycle(self):
+        if self.pages_since_recycle >= self.max_pages:
+            self.recycle_browser(f"{self.pages_since_recycle} pages loaded")
+            return
+        memory = self.browser_memory_mb()
+        if memory is not None and memory > self.max_memory_mb:
+            self.recycle_browser(f"browser using {memory:.0f} MB")
+
+    def deliver(self, leads):
+        """
+        Store and send only leads not seen in earlier polls
+        """
+        return self.agent.deliver_new_leads(leads)
+
+    def poll_once(self):
+        """
+        Visit every platform/city once on the warm browser
+        """
+        started = time.time()
+        self.status["state"] = "polling"
+        failures = 0
+        for platform in self.platforms:
+            for city in self.cities:
+                if self.stop_event.is_set():
+                    return
+                try:
+                    self.ensure_browser()
+                    leads = self.agent.extract_platform(platform, city)
+                    self.pages_since_recycle += 1
+                    self.status["pages"] += 1
+                    self.status["leads_new"] += self.deliver(leads)
+                except Exception as e:
+                    logger.error(f"Error polling {platform} {city or ''}: {e}")
+                    self.status["last_error"] = f"{datetime.now().isoformat()} {platform}: {e}"
+                    self.status["failed_pages"] += 1
+                    failures += 1
+                    # A broken session is cheaper to replace than to debug
+                    self.recycle_browser("error during poll")
+                    continue
+                self.maybe_recycle()
+
+        # Leads stored earlier but not in the sheet (webhook outage, crash
+        # before sending) are not new to deliver() any more: send them here
+        try:
+            self.agent.deliver_undelivered()
+        except Exception as e:
+            logger.error(f"Error re-sending undelivered leads: {e}")
+
+        self.status["polls"] += 1
+        if failures:
+            self.status["failed_polls"] += 1
+        self.status["last_poll_at"] = datetime.now().isoformat()
+        self.status["last_poll_seconds"] = round(time.time() - started, 1)
+
+    def health(self):
+        """
+        Current health snapshot
+        """
+        health = dict(self.status)
+        health["browser_running"] = self.agent.driver is not None
+        health["pages_since_recycle"] = self.pages_since_recycle
+        health["browser_memory_mb"] = self.browser_memory_mb() if self.agent.driver else None
+        return health
+
+    def write_health(self):
+        if not self.health_file:
+            return
+        try:
+            with open(self.health_file, 'w', encoding='utf-8') as f:
+                json.dump(self.health(), f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write health file: {e}")
+
+    def run_forever(self):
+        """
+        Poll, sleep interval +/- jitter, repeat until stop()
+        """
+        logger.info(f"Daemon started: polling {self.platforms} every {self.interval}s")
+        try:
+            while not self.stop_event.is_set():
+                self.poll_once()
+                delay = max(0, self.interval + random.uniform(-self.jitter, self.jitter))
+                self.status["state"] = "sleeping"
+                self.status["next_poll_at"] = datetime.fromtimestamp(time.time() + delay).isoformat()
+                self.write_health()
+                logger.info(f"Poll finished, next in {delay:.0f}s")
+                self.stop_event.wait(delay)
+        finally:
+            self.status["state"] = "stopped"
+            self.agent.quit_driver()
+            self.agent.enricher.close()
+            self.write_health()
+            logger.info("Daemon stopped")
+
+    def stop(self):
+        self.stop_event.set()
+        # Ends card waits and send delays inside the current poll as well
+        self.agent.stop()
+
+def main():
+    """
+    Entry point
+    """
+    multiprocessing.freeze_support()
+    setup_logging()
+    agent = LeadAgent(interactive=False)
+    daemon = LeadDaemon(agent)
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Listing detail page enrichment
+Opens listing URLs in a small, fixed set of tabs of the running WebDriver
+session and reads the description, seller block and key/value parameters
+of each detail page. Tabs navigate without blocking, so several pages load
+at once while the single driver connection polls whichever tab is ready
+"""
+
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Per-platform CSS selectors, first match wins; override with
+# extraction_settings.<platform>.detail_selectors in config.json
+DEFAULT_SELECTORS = {
+    "facebook": {
+        "description": ["[data-testid='marketplace_pdp_description']", "div[class*='description']"],
+        "seller_info": ["a[href*='/marketplace/profile/']", "[class*='seller']"],
+        "params": ["[data-testid='marketplace_pdp_details']", "ul[class*='details']"],
+    },
+    "olx_webstore": {
+        "description": ["[data-aut-id='itemDescriptionContent']", "[data-testid='description']"],
+        "seller_info": ["[data-aut-id='profileCard']", "[class*='seller']"],
+        "params": ["[data-aut-id='itemParams']", "[data-testid='details']"],
+    },
+}
+
+# Set on a tab right before it navigates away: the next page will not have
+# it, which tells a newly loaded page apart from the previous one
+MARK_SCRIPT = "window.__leadDetailPending = true; window.location.href = arguments[0];"
+
+# Returns null while the page is not ready (old page, still loading, or no
+# description rendered yet unless force is set), else the fields found
+READ_SCRIPT = """
+const selectors = arguments[0], force = arguments[1];
+if (window.__leadDetailPending || document.readyState !== 'complete') return null;
+const first = (list) => {
+    for (const selector of list || []) {
+        const element = document.querySelector(selector);
+        if (element && element.innerText.trim()) return element.innerText.trim();
+    }
+    return null;
+};
+const details = {
+    description: first(selectors.description),
+    seller_info: first(selectors.seller_info),
+    params: first(selectors.params),
+};
+if (!details.description && !force) return null;
+return details;
+"""
+
+def merge_details(card, details):
+    """
+    Add detail page fields to a raw card dictionary (in place)
+    The card's own seller snippet is kept when it has one
+    """
+    if not details:
+        return card
+    if details.get('description'):
+        card['description'] = details['description']
+    if details.get('params'):
+        # One "label value" pair per line; keep lines apart so a value is
+        # never read together with the next label ("2017 KM driven")
+        lines = (line.strip() for line in details['params'].splitlines())
+        card['params'] = " | ".join(line for line in lines if line)
+    if details.get('seller_info'):
+        if card.get('seller_info'):
+            card['description'] = f"{card.get('description') or ''} {details['seller_info']}".strip()
+        else:
+            card['seller_info'] = details['seller_info']
+    return card
+
+class DetailFetcher:
+    """
+    Fetch detail pages concurrently in a bounded number of tabs
+    """
+
+    def __init__(self, driver, tabs=4, timeout=15, poll_seconds=0.2):
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+
+    def _start(self, handle, url, active):
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(MARK_SCRIPT, url)
+        active[handle] = (url, time.time())
+
+    def fetch(self, urls, selectors):
+        """
+        Returns {url: {"description", "seller_info", "params"}} for the pages
+        that loaded; pages that fail or time out are left out
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        pending = deque(dict.fromkeys(url for url in urls if url))
+        results = {}
+        if not pending:
+            return results
+
+        started = time.time()
+        origin = self.driver.current_window_handle
+        handles = []
+        active = {}
+        try:
+            for _ in range(min(self.tabs, len(pending))):
+                self.driver.switch_to.new_window('tab')
+                handles.append(self.driver.current_window_handle)
+            for handle in handles:
+                self._start(handle, pending.popleft(), active)
+
+            while active:
+                finished = False
+                for handle in list(active):
+                    url, opened = active[handle]
+                    timed_out = time.time() - opened > self.timeout
+                    try:
+                        self.driver.switch_to.window(handle)
+                        details = self.driver.execute_script(READ_SCRIPT, selectors, timed_out)
+                    except WebDriverException as e:
+                        logger.warning(f"Detail page failed: {url}: {e}")
+                        details = None
+                        timed_out = True
+                    if details is None and not timed_out:
+                        continue
+
+                    # A forced read after the timeout returns all fields
+                    # null when none of the selectors matched
+                    if details and any(details.values()):
+                        results[url] = details
+                    else:
+                        logger.warning(f"Detail page timed out: {url}")
+                    del active[handle]
+                    finished = True
+                    if pending:
+                        try:
+                            self._start(handle, pending.popleft(), active)
+                        except WebDriverException as e:
+                            logger.warning(f"Could not reuse tab: {e}")
+                if not finished:
+                    time.sleep(self.poll_seconds)
+        finally:
+            for handle in handles:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except WebDriverException:
+                    pass
+            self.driver.switch_to.window(origin)
+
+        logger.info(f"Fetched {len(results)} detail pages in {time.time() - started:.1f}s "
+                    f"using {len(handles)} tabs")
+        return results
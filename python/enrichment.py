@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lead enrichment stage
+Turns raw listing card text into Lead records, optionally fanning large
+batches out to a process pool so regex parsing uses every core
+
+Usage (offline re-processing of saved cards, one JSON object per line):
+    python enrichment.py cards.jsonl leads.jsonl --workers 8
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from models import Lead
+from utilities import (
+    extract_phone, extract_year, extract_km, extract_brand, is_owner,
+    extract_registration_number, extract_variant,
+)
+
+logger = logging.getLogger(__name__)
+
+def enrich_card(card):
+    """
+    Build a Lead from one raw card dictionary
+    Expected keys: platform, source, title, price, seller_info, location,
+    city, url, description, params, extracted_date (all optional except title)
+    params is the detail page's key/value block (year, km, fuel ...)
+    """
+    title = card.get('title') or ""
+    seller_info = card.get('seller_info')
+    description = card.get('description') or ""
+    params = card.get('params') or ""
+    details = f"{title} {params} {description}".strip()
+    year = extract_year(title)
+    if year == "N/A" and params:
+        year = extract_year(params)
+
+    contact_text = " ".join(t for t in (seller_info, description) if t)
+
+    return Lead(
+        platform=card.get('platform'),
+        source=card.get('source'),
+        title=title,
+        price=card.get('price'),
+        seller_name=seller_info,
+        phone=extract_phone(contact_text),
+        reg_no=extract_registration_number(details),
+        brand=extract_brand(title),
+        variant=extract_variant(details),
+        year=year,
+        km=extract_km(details),
+        location=card.get('location'),
+        is_owner=is_owner(seller_info),
+        url=card.get('url'),
+        city=card.get('city'),
+        extracted_date=card.get('extracted_date') or datetime.now().isoformat(),
+    )
+
+def _warm_worker():
+    """
+    Pool initializer: importing utilities compiles its patterns, and one
+    dry run pulls the remaining code paths into the worker before real work
+    """
+    enrich_card({"title": "Maruti Swift VXi 2018 45,000 km", "seller_info": "owner 9876543210"})
+
+class ParallelEnricher:
+    """
+    Enrich batches of raw cards, in order, on a pool of warmed worker processes
+    Small batches are enriched inline where process overhead would dominate
+    """
+
+    def __init__(self, workers=None, chunk_size=64, min_batch=200):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_batch = min_batch
+        self.executor = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the "enrichment" section of config.json
+        """
+        settings = config.get('enrichment', {})
+        return cls(
+            workers=settings.get('workers') or None,
+            chunk_size=settings.get('chunk_size', 64),
+            min_batch=settings.get('min_batch', 200),
+        )
+
+    def _pool(self):
+        if self.executor is None:
+            logger.info(f"Starting enrichment pool with {self.workers} workers")
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        return self.executor
+
+    def map(self, func, items):
+        """
+        Apply a picklable top-level function to items, results in order
+        """
+        items = list(items)
+        if self.workers <= 1 or len(items) < self.min_batch:
+            return [func(item) for item in items]
+
+        # Keep every worker busy with a few chunks each
+        chunk_size = max(1, min(self.chunk_size, len(items) // (self.workers * 4) or 1))
+        return list(self._pool().map(func, items, chunksize=chunk_size))
+
+    def enrich(self, cards):
+        """
+        Enrich a batch of raw cards, returns Leads in the same order
+        """
+        return self.map(enrich_card, cards)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def enrich_cards(cards, workers=None, chunk_size=64):
+    """
+    One-shot helper for offline re-processing
+    """
+    with ParallelEnricher(workers=workers, chunk_size=chunk_size, min_batch=0) as enricher:
+        return enricher.enrich(cards)
+
+def main(argv=None):
+    """
+    Entry point for offline re-processing of saved raw cards
+    """
+    parser = argparse.ArgumentParser(description="Re-run enrichment over saved listing cards")
+    parser.add_argument("input", help="JSONL file with one raw card per line")
+    parser.add_argument("output", help="JSONL file to write enriched leads to")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Cards read per batch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    count = 0
+    with ParallelEnricher(workers=args.workers, min_batch=0) as enricher, \
+            open(args.input, 'r', encoding='utf-8') as src, \
+            open(args.output, 'w', encoding='utf-8') as dst:
+        batch = []
+        for line in src:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= args.batch_size:
+                for lead in enricher.enrich(batch):
+                    dst.write(json.dumps(lead.to_dict()) + "\n")
+                count += len(batch)
+                batch = []
+        if batch:
+            for lead in enricher.enrich(batch):
+                dst.write(json.dumps(lead.to_dict()) + "\n")
+            count += len(batch)
+
+    logger.info(f"Enriched {count} cards into {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
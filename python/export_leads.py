@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export stored leads to CSV or Parquet
+Rows are streamed from leads.db in chunks so memory stays flat for any table size
+
+Usage:
+    python export_leads.py leads.csv
+    python export_leads.py leads.parquet --platform Facebook --since 2024-01-01
+"""
+
+import csv
+import sys
+import argparse
+import logging
+from datetime import datetime
+from lead_store import connect, iter_leads, sheet_row, SHEET_COLUMNS, DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+def export_csv(conn, output_path, chunk_size=5000, **filters):
+    """
+    Write leads to CSV in the 14-column Google Sheets layout
+    Returns number of rows written
+    """
+    count = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SHEET_COLUMNS)
+        writer.writeheader()
+        for rows in iter_leads(conn, chunk_size=chunk_size, **filters):
+            writer.writerows(sheet_row(row) for row in rows)
+            count += len(rows)
+    logger.info(f"Exported {count} leads to {output_path}")
+    return count
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("date", pa.timestamp("us")),
+        ("name", pa.string()),
+        ("phone", pa.string()),
+        ("reg_no", pa.string()),
+        ("brand", pa.string()),
+        ("variant", pa.string()),
+        ("year", pa.int16()),
+        ("km", pa.int32()),
+        ("location", pa.string()),
+        ("follow_up", pa.string()),
+        ("source", pa.string()),
+        ("is_owner", pa.bool_()),
+        ("title", pa.string()),
+        ("price", pa.string()),
+        ("platform", pa.string()),
+        ("status", pa.string()),
+    ])
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_datetime(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def _parquet_columns(rows):
+    """
+    Turn one chunk of rows into typed column lists
+    """
+    return {
+        "date": [_to_datetime(row["date"]) for row in rows],
+        "name": [row["name"] for row in rows],
+        "phone": [row["phone"] for row in rows],
+        "reg_no": [row["reg_no"] for row in rows],
+        "brand": [row["brand"] for row in rows],
+        "variant": [row["variant"] for row in rows],
+        "year": [_to_int(row["year"]) for row in rows],
+        "km": [_to_int(row["km"]) for row in rows],
+        "location": [row["location"] for row in rows],
+        "follow_up": [row["follow_up"] for row in rows],
+        "source": [row["source"] for row in rows],
+        "is_owner": [None if row["is_owner"] is None else bool(row["is_owner"]) for row in rows],
+        "title": [row["title"] for row in rows],
+        "price": [row["price"] for row in rows],
+        "platform": [row["platform"] for row in rows],
+        "status": [row["status"] for row in rows],
+    }
+
+def export_parquet(conn, output_path, chunk_size=50000, **filters):
+    """
+    Write leads to Parquet with typed columns, one row group per chunk
+    Requires pyarrow
+    Returns number of rows written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+    schema = _parquet_schema()
+    count = 0
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for rows in iter_leads(conn, chunk_size=chunk_size, **filters):
+            writer.write_table(pa.Table.from_pydict(_parquet_columns(rows), schema=schema))
+            count += len(rows)
+    logger.info(f"Exported {count} leads to {output_path}")
+    return count
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description="Export leads from the SQLite store")
+    parser.add_argument("output", help="Output file (.csv or .parquet)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to leads database")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Defaults to output file extension")
+    parser.add_argument("--platform", help="Only export this platform, e.g. Facebook")
+    parser.add_argument("--since", help="Only leads dated on/after this ISO date")
+    parser.add_argument("--until", help="Only leads dated before this ISO date")
+    parser.add_argument("--status", help="Only leads with this status")
+    parser.add_argument("--chunk-size", type=int, help="Rows fetched per chunk")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    filters = {
+        "platform": args.platform,
+        "since": args.since,
+        "until": args.until,
+        "status": args.status,
+    }
+    if args.chunk_size:
+        filters["chunk_size"] = args.chunk_size
+
+    conn = connect(args.db)
+    try:
+        if fmt == "parquet":
+            export_parquet(conn, args.output, **filters)
+        else:
+            export_csv(conn, args.output, **filters)
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
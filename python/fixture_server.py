@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local marketplace fixture server
+Serves listing pages that load their data from JSON APIs shaped like the
+Facebook GraphQL and OLX search responses and render cards with the same
+selectors as the real sites, plus OLX-style detail pages. Point the agent
+at it to exercise network capture, the DOM fallback, page readiness and
+detail page enrichment without touching the live sites
+
+Usage:
+    python fixture_server.py --port 8765 --delay-ms 800
+Then set in config.json:
+    extraction_settings.facebook.city_url = http://localhost:8765/facebook/marketplace/{city}
+    extraction_settings.olx_webstore.city_url = http://localhost:8765/olx/{city}
+    extraction_settings.olx_webstore.page_url = http://localhost:8765/olx/{city}?page={page}
+"""
+
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+CARS = [
+    ("Maruti Swift", "VXi"), ("Hyundai Creta", "SX"), ("Honda City", "ZX"),
+    ("Tata Nexon", "XZ Plus"), ("Mahindra XUV500", "W8"), ("Toyota Innova", "GX"),
+    ("Kia Seltos", "HTX"), ("Renault Kwid", "RXT"),
+]
+SELLERS = ["Rahul Sharma", "Priya Motors", "Amit Verma", "City Car Bazaar", "Sunita Rao"]
+
+# Listings handed out so far by numeric id, for the detail pages
+SERVED = {}
+
+def fixture_listings(platform, city, page=1, count=20):
+    """
+    Deterministic listing records for one platform/city/page
+    """
+    rng = random.Random(f"{platform}:{city}:{page}")
+    listings = []
+    for number in range(count):
+        model, variant = rng.choice(CARS)
+        year = rng.randint(2010, 2024)
+        km = rng.randint(5, 150) * 1000
+        seller = rng.choice(SELLERS)
+        phone = f"9{rng.randint(100000000, 999999999)}"
+        listings.append({
+            # Numeric like the real marketplace ids, so page links and
+            # captured API records yield the same listing id
+            "id": str(zlib.crc32(f"{platform}:{city}:{page}:{number}".encode("utf-8"))),
+            "title": f"{model} {variant} {year}",
+            "price": f"₹ {rng.randint(2, 25)},{rng.randint(10, 99)},000",
+            "year": year,
+            "km": km,
+            "seller": seller,
+            "description": f"{'Single owner' if 'Motors' not in seller else 'Dealer car'}, {km:,} km driven, "
+                           f"call {phone}. Reg MH{rng.randint(1, 50):02d}AB{rng.randint(1000, 9999)}",
+            "city": city,
+        })
+    SERVED.update((item["id"], item) for item in listings)
+    return listings
+
+def facebook_response(city, count=20):
+    """
+    Marketplace GraphQL-shaped search response
+    """
+    edges = []
+    for item in fixture_listings("facebook", city, 1, count):
+        edges.append({"node": {"listing": {
+            "id": item["id"],
+            "marketplace_listing_title": item["title"],
+            "listing_price": {"formatted_amount": item["price"]},
+            "location": {"reverse_geocode": {"city": city}},
+            "marketplace_listing_seller": {"name": item["seller"]},
+            "custom_sub_titles_with_rendering_flags": [{"subtitle": f"{item['km'] // 1000}K km"}],
+            "redacted_description": {"text": item["description"]},
+        }}})
+    return {"data": {"marketplace_search": {"feed_units": {"edges": edges}}}}
+
+def olx_response(city, page=1, count=20):
+    """
+    OLX search API-shaped response
+    """
+    ads = []
+    for item in fixture_listings("olx_webstore", city, page, count):
+        ads.append({
+            "id": item["id"],
+            "title": item["title"],
+            "description": item["description"],
+            "price": {"value": {"display": item["price"]}},
+            "locations_resolved": {"ADMIN_LEVEL_3_name": city.title()},
+            "user": {"name": item["seller"]},
+            "parameters": [
+                {"key": "year", "key_name": "Year", "value": str(item["year"])},
+                {"key": "mileage", "key_name": "KM driven", "formatted_value": f"{item['km']:,} km"},
+            ],
+            "main_info": f"{item['year']} - {item['km']:,} km",
+        })
+    return {"data": ads, "metadata": {"page": page}}
+
+FACEBOOK_PAGE = """<!doctype html>
+<html><body><div id="feed"></div>
+<script>
+fetch('/api/graphql/', {method: 'POST', body: JSON.stringify({city: %(city)s})})
+  .then(r => r.json())
+  .then(data => {
+    const feed = document.getElementById('feed');
+    for (const edge of data.data.marketplace_search.feed_units.edges) {
+      const l = edge.node.listing;
+      const card = document.createElement('div');
+      card.setAttribute('role', 'article');
+      card.innerHTML = '<a href="/facebook/marketplace/item/' + l.id + '/?ref=search"><h2></h2></a>' +
+        '<span class="x1price"></span><div class="x1seller"></div>';
+      card.querySelector('h2').textContent = l.marketplace_listing_title;
+      card.querySelector('span').textContent = l.listing_price.formatted_amount;
+      card.querySelector('div').textContent = l.marketplace_listing_seller.name;
+      feed.appendChild(card);
+    }
+  });
+</script></body></html>
+"""
+
+OLX_PAGE = """<!doctype html>
+<html><body><ul id="ads"></ul>
+<script>
+fetch('/api/relevance/v4/search?location=' + encodeURIComponent(%(city)s) + '&page=%(page)d')
+  .then(r => r.json())
+  .then(data => {
+    const list = document.getElementById('ads');
+    for (const ad of data.data) {
+      const card = document.createElement('li');
+      card.setAttribute('data-testid', 'ad-card');
+      const slug = ad.title.toLowerCase().replace(/[^a-z0-9]+/g, '-');
+      card.innerHTML = '<a href="/olx/item/' + slug + '-iid-' + ad.id + '"><span class="_title"></span>' +
+        '<span class="_price"></span><span class="_location"></span></a>';
+      const spans = card.querySelectorAll('span');
+      spans[0].textContent = ad.title;
+      spans[1].textContent = ad.price.value.display;
+      spans[2].textContent = ad.locations_resolved.ADMIN_LEVEL_3_name;
+      list.appendChild(card);
+    }
+  });
+</script></body></html>
+"""
+
+OLX_DETAIL_PAGE = """<!doctype html>
+<html><body>
+<h1>%(title)s</h1>
+<div data-aut-id="itemParams"><div>Year</div><div>%(year)s</div><div>KM driven</div><div>%(km)s km</div></div>
+<div data-aut-id="itemDescriptionContent">%(description)s</div>
+<div data-aut-id="profileCard">%(seller)s</div>
+</body></html>
+"""
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Routes: /facebook/marketplace/<city>, /api/graphql/, /olx/<city>?page=N,
+    /api/relevance/v4/search, /olx/item/<slug>-iid-<id>
+    """
+
+    delay_ms = 0
+    listings = 20
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload):
+        # API latency is what the readiness layer has to wait out
+        time.sleep(self.delay_ms / 1000)
+        self._send(json.dumps(payload), "application/json")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+        page = int(query.get("page", ["1"])[0])
+
+        if parts[:2] == ["facebook", "marketplace"] and len(parts) == 3:
+            return self._send(FACEBOOK_PAGE % {"city": json.dumps(parts[2])})
+        if parts[:2] == ["olx", "item"] and len(parts) == 3:
+            return self._olx_detail(parts[2])
+        if parts[:1] == ["olx"] and len(parts) == 2:
+            return self._send(OLX_PAGE % {"city": json.dumps(parts[1]), "page": page})
+        if url.path.startswith("/api/relevance/"):
+            city = query.get("location", ["pune"])[0]
+            return self._send_json(olx_response(city, page, self.listings))
+        self._send("Not found", "text/plain", 404)
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/api/graphql":
+            return self._send("Not found", "text/plain", 404)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            city = json.loads(self.rfile.read(length) or b"{}").get("city") or "pune"
+        except ValueError:
+            city = "pune"
+        self._send_json(facebook_response(city, self.listings))
+
+    def _olx_detail(self, path):
+        match = re.search(r"iid-(\d+)$", path)
+        item = SERVED.get(match.group(1)) if match else None
+        if item is None:
+            return self._send("Not found", "text/plain", 404)
+        self._send(OLX_DETAIL_PAGE % {
+            "title": item["title"], "year": item["year"], "km": f"{item['km']:,}",
+            "description": item["description"], "seller": item["seller"],
+        })
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def serve(port=8765, delay_ms=0, listings=20):
+    """
+    Start the fixture server in the background, returns the server
+    (call shutdown() to stop it)
+    """
+    import threading
+
+    handler = type("Handler", (FixtureHandler,), {"delay_ms": delay_ms, "listings": listings})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description="Serve local Facebook/OLX-like listing fixtures")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=int, default=0, help="Latency of the JSON APIs")
+    parser.add_argument("--listings", type=int, default=20, help="Listings per page")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = serve(args.port, args.delay_ms, args.listings)
+    logger.info(f"Fixture server on http://127.0.0.1:{args.port}/ (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
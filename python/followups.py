@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Follow-up scheduling and reminders
+Due times live in SQLite (indexed by due time); only the next window of
+reminders is held in an in-memory min-heap, so the scheduler wakes exactly
+when the next reminder is due instead of scanning every lead
+
+Usage:
+    python followups.py            # run the reminder loop with notifiers from config.json
+"""
+
+import sys
+import json
+import time
+import heapq
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+import lead_store
+from lead_store import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY_SECONDS = 300
+
+def ensure_schema(conn):
+    """
+    Create the followups table and its due-time index
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS followups (
+            id INTEGER PRIMARY KEY,
+            lead_id INTEGER,
+            due_at REAL,
+            message TEXT,
+            status TEXT DEFAULT 'scheduled',
+            attempts INTEGER DEFAULT 0,
+            created_at TIMESTAMP,
+            fired_at REAL
+        )
+    ''')
+    # Partial index: only pending reminders are ever range-scanned
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_followups_due
+        ON followups (due_at) WHERE status = 'scheduled'
+    ''')
+    conn.commit()
+
+def add_followup(conn, lead_id, due_at, message):
+    """
+    Insert a scheduled follow-up, returns its id
+    Caller is responsible for committing
+    """
+    cursor = conn.execute(
+        "INSERT INTO followups (lead_id, due_at, message, status, created_at) VALUES (?, ?, ?, 'scheduled', ?)",
+        (lead_id, due_at, message, datetime.now().isoformat())
+    )
+    return cursor.lastrowid
+
+class LogNotifier:
+    """
+    Local notifier: logs reminders and keeps them in memory (useful for tests)
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def notify(self, followup):
+        self.sent.append(followup)
+        logger.info(f"Follow-up due for lead {followup['lead_id']}: {followup['message']}")
+        return True
+
+class TelegramNotifier:
+    """
+    Send reminders to a Telegram chat through the Bot API
+    """
+
+    def __init__(self, token, chat_id, timeout=10):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def notify(self, followup):
+        import requests
+
+        try:
+            response = requests.post(
+                self.url,
+                json={"chat_id": self.chat_id, "text": f"🔔 Follow-up: {followup['message']}"},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return True
+            logger.warning(f"Telegram notification failed: {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error sending Telegram notification: {e}")
+        return False
+
+def notifiers_from_config(config):
+    """
+    Build notifiers from config.json (Telegram when configured, else the log)
+    """
+    token = config.get('telegram_token')
+    chat_id = config.get('telegram_chat_id')
+    if token and chat_id:
+        return [TelegramNotifier(token, chat_id)]
+    return [LogNotifier()]
+
+class FollowUpScheduler:
+    """
+    Fire follow-up reminders when they fall due
+
+    The heap holds (due_at, id) for reminders inside [now, horizon]; it is
+    refilled from the due-time index when it empties, when the horizon
+    passes, or every refresh_seconds to pick up rows written by other
+    processes. schedule() is an indexed insert plus a heap push.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, notifiers=None, window_seconds=3600,
+                 window_size=1000, refresh_seconds=60):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL keeps single-row schedule() commits cheap and lets the agent
+        # write leads while the reminder loop reads
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        lead_store.ensure_schema(self.conn)
+        ensure_schema(self.conn)
+        self.notifiers = notifiers if notifiers is not None else [LogNotifier()]
+        self.window_seconds = window_seconds
+        self.window_size = window_size
+        self.refresh_seconds = refresh_seconds
+        self.heap = []
+        self.horizon = 0
+        self.refreshed_at = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def schedule(self, lead_id, due_at, message):
+        """
+        Schedule a reminder; due_at is a datetime or a UNIX timestamp
+        """
+        if isinstance(due_at, datetime):
+            due_at = due_at.timestamp()
+        with self.lock:
+            with self.conn:
+                followup_id = add_followup(self.conn, lead_id, due_at, message)
+            if due_at <= self.horizon:
+                heapq.heappush(self.heap, (due_at, followup_id))
+                if self.heap[0][1] == followup_id:
+                    self.wakeup.set()
+        return followup_id
+
+    def schedule_many(self, items):
+        """
+        Schedule (lead_id, due_at, message) tuples in one transaction
+        """
+        ids = []
+        with self.lock:
+            with self.conn:
+                for lead_id, due_at, message in items:
+                    if isinstance(due_at, datetime):
+                        due_at = due_at.timestamp()
+                    followup_id = add_followup(self.conn, lead_id, due_at, message)
+                    ids.append(followup_id)
+                    if due_at <= self.horizon:
+                        heapq.heappush(self.heap, (due_at, followup_id))
+            self.wakeup.set()
+        return ids
+
+    def cancel(self, followup_id):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE followups SET status = 'cancelled' WHERE id = ? AND status = 'scheduled'",
+                (followup_id,)
+            )
+
+    def cancel_for_lead(self, lead_id):
+        """
+        Cancel pending reminders, e.g. once a lead has been contacted
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE followups SET status = 'cancelled' WHERE lead_id = ? AND status = 'scheduled'",
+                (lead_id,)
+            )
+
+    def _refill(self, now):
+        rows = self.conn.execute(
+            "SELECT id, due_at FROM followups WHERE status = 'scheduled' AND due_at <= ? "
+            "ORDER BY due_at LIMIT ?",
+            (now + self.window_seconds, self.window_size)
+        ).fetchall()
+        self.heap = [(row["due_at"], row["id"]) for row in rows]
+        heapq.heapify(self.heap)
+        if len(rows) == self.window_size:
+            # Window is full: only trust the heap up to the last loaded row
+            self.horizon = rows[-1]["due_at"]
+        else:
+            self.horizon = now + self.window_seconds
+        self.refreshed_at = now
+
+    def _fire(self, followup_id, now):
+        row = self.conn.execute(
+            "SELECT * FROM followups WHERE id = ? AND status = 'scheduled'", (followup_id,)
+        ).fetchone()
+        if row is None:
+            return False  # Cancelled or already fired
+
+        followup = dict(row)
+        delivered = False
+        for notifier in self.notifiers:
+            try:
+                delivered = notifier.notify(followup) or delivered
+            except Exception as e:
+                logger.error(f"Notifier {type(notifier).__name__} failed: {e}")
+
+        with self.conn:
+            if delivered:
+                self.conn.execute(
+                    "UPDATE followups SET status = 'sent', fired_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, followup_id)
+                )
+                self.conn.execute(
+                    "UPDATE leads SET status = 'follow-up' WHERE id = ? AND status = 'new'",
+                    (row["lead_id"],)
+                )
+            else:
+                retry_at = now + RETRY_DELAY_SECONDS
+                self.conn.execute(
+                    "UPDATE followups SET due_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (retry_at, followup_id)
+                )
+                if retry_at <= self.horizon:
+                    heapq.heappush(self.heap, (retry_at, followup_id))
+        return delivered
+
+    def run_pending(self, now=None):
+        """
+        Fire every reminder that is due, returns the number delivered
+        """
+        now = time.time() if now is None else now
+        fired = 0
+        with self.lock:
+            if not self.heap or now >= self.horizon or now - self.refreshed_at >= self.refresh_seconds:
+                self._refill(now)
+            while self.heap and self.heap[0][0] <= now:
+                _, followup_id = heapq.heappop(self.heap)
+                if self._fire(followup_id, now):
+                    fired += 1
+        return fired
+
+    def seconds_until_next(self, now=None):
+        """
+        How long the loop may sleep before something can be due
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            deadline = min(self.horizon, self.refreshed_at + self.refresh_seconds)
+            if self.heap:
+                deadline = min(deadline, self.heap[0][0])
+        return max(0.0, deadline - now)
+
+    def run_forever(self):
+        """
+        Reminder loop; sleeps until the next due time or an earlier schedule()
+        """
+        logger.info("Follow-up scheduler started")
+        while not self.stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Error running follow-ups: {e}")
+            self.wakeup.wait(self.seconds_until_next())
+            self.wakeup.clear()
+        logger.info("Follow-up scheduler stopped")
+
+    def start(self):
+        """
+        Run the reminder loop in a background thread
+        """
+        self.thread = threading.Thread(target=self.run_forever, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join()
+        self.conn.close()
+
+def main():
+    """
+    Entry point
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+
+    scheduler = FollowUpScheduler(
+        db_path=config.get('database', DEFAULT_DB_PATH),
+        notifiers=notifiers_from_config(config),
+    )
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,11 +10,12 @@ from tkinter import ttk, messagebox, filedialog
 import json
 import threading
 import logging
+import multiprocessing
 from datetime import datetime
 from pathlib import Path
-import sqlite3
 import queue
-from agent import LeadAgent
+import lead_store
+import analytics
 
 class LeadAgentGUI:
     def __init__(self, root):
@@ -25,6 +26,7 @@ class LeadAgentGUI:
         
         self.agent = None
         self.running = False
+        self.stop_event = threading.Event()
         self.results_queue = queue.Queue()
         
         self.setup_logging()
@@ -44,22 +46,8 @@ class LeadAgentGUI:
     
     def create_database(self):
         """Create SQLite database for tracking"""
-        self.conn = sqlite3.connect('leads.db')
+        self.conn = lead_store.connect('leads.db')
         self.cursor = self.conn.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS leads (
-                id INTEGER PRIMARY KEY,
-                date TEXT,
-                phone TEXT,
-                brand TEXT,
-                year TEXT,
-                km TEXT,
-                platform TEXT,
-                status TEXT,
-                created_at TIMESTAMP
-            )
-        ''')
-        self.conn.commit()
     
     def create_gui(self):
         """Create main GUI interface"""
@@ -151,6 +139,33 @@ class LeadAgentGUI:
         
         self.results_label = ttk.Label(results_frame, text="Leads Extracted: 0 | Success: 0 | Failed: 0", font=("Arial", 10))
         self.results_label.pack(padx=5, pady=5)
+        
+        # Search Frame
+        search_frame = ttk.LabelFrame(self.root, text="🔎 Search Leads")
+        search_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        search_bar = ttk.Frame(search_frame)
+        search_bar.pack(fill="x", padx=5, pady=5)
+        self.search_entry = ttk.Entry(search_bar, width=50)
+        self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        ttk.Button(search_bar, text="Search", command=self.search_leads).pack(side="left", padx=5)
+        self.search_status = ttk.Label(search_bar, text="Car model, seller, location or remark (prefixes work)")
+        self.search_status.pack(side="left", padx=10)
+        
+        columns = [
+            ("date", "Date", 140), ("name", "Name", 120), ("phone", "Mobile", 100),
+            ("brand", "Car Model", 140), ("year", "Year", 50), ("km", "KM", 70),
+            ("location", "Address", 120), ("platform", "Source", 90), ("status", "Status", 70),
+        ]
+        self.search_results = ttk.Treeview(search_frame, columns=[c[0] for c in columns], show="headings", height=6)
+        for name, heading, width in columns:
+            self.search_results.heading(name, text=heading)
+            self.search_results.column(name, width=width)
+        self.search_results.pack(fill="both", expand=True, padx=5, pady=5)
+        self.search_job = None
+        
+        self.refresh_results()
     
     def log(self, message):
         """Add message to log display"""
@@ -160,6 +175,52 @@ class LeadAgentGUI:
         self.log_text.config(state="disabled")
         self.logger.info(message)
     
+    def refresh_results(self):
+        """Update the results line from the analytics tables every few seconds"""
+        try:
+            stats = analytics.totals(self.conn)
+            text = (f"Leads Extracted: {stats['total']} | Success: {stats['delivered']} | "
+                    f"Failed: {stats['delivery_failed']}")
+            if stats['owner_ratio'] is not None:
+                text += f" | Owners: {stats['owner_ratio']:.0%}"
+            if stats['median_year'] is not None:
+                text += f" | Median Year: {stats['median_year']}"
+            if stats['median_km'] is not None:
+                text += f" | Median KM: {stats['median_km']:,}"
+            self.results_label.config(text=text)
+        except Exception as e:
+            self.logger.error(f"Error reading analytics: {e}")
+        self.root.after(5000, self.refresh_results)
+    
+    def schedule_search(self, event=None):
+        """Search as the user types, once typing pauses"""
+        if self.search_job:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(200, self.search_leads)
+    
+    def search_leads(self):
+        """Run a full-text search and show the results"""
+        self.search_job = None
+        self.search_results.delete(*self.search_results.get_children())
+        text = self.search_entry.get().strip()
+        if not text:
+            self.search_status.config(text="")
+            return
+        
+        try:
+            started = datetime.now()
+            rows = lead_store.search_leads(self.conn, text, limit=200)
+            elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+        except Exception as e:
+            self.search_status.config(text=f"Search error: {e}")
+            return
+        
+        for row in rows:
+            self.search_results.insert("", tk.END, values=[
+                row[name] if row[name] is not None else "" for name in self.search_results["columns"]
+            ])
+        self.search_status.config(text=f"{len(rows)} results in {elapsed_ms:.0f} ms")
+    
     def toggle_extension(self):
         """Toggle Chrome Extension mode"""
         if self.extension_var.get():
@@ -170,11 +231,15 @@ class LeadAgentGUI:
     
     def start_agent(self):
         """Start the lead extraction agent"""
+        if self.running:
+            # One agent at a time: they would share the browser profile and run journal
+            return
         self.log("Starting Lead Agent...")
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
         self.status_label.config(text="🟢 Running", foreground="green")
         self.running = True
+        self.stop_event = threading.Event()
         
         # Start agent in separate thread
         thread = threading.Thread(target=self.run_agent)
@@ -196,24 +261,42 @@ class LeadAgentGUI:
                 config['headless_mode'] = True
             
             self.log(f"Platforms: Facebook={self.facebook_var.get()}, OLX={self.olx_var.get()}")
+            config['platforms'] = [
+                p for p, enabled in (("facebook", self.facebook_var.get()), ("olx_webstore", self.olx_var.get()))
+                if enabled
+            ]
+            
+            # Imported here: selenium/requests only load once a run starts
+            from agent import LeadAgent
+            
+            # Interactive: the Facebook login gets login_timeout, not the page wait
+            self.agent = LeadAgent(interactive=True, stop_event=self.stop_event)
+            self.agent.config.update(config)
+            self.agent.webhook_url = config.get('webhook_url')
             self.log("Agent started successfully!")
             self.log("Extracting leads...")
-            
-            # Simulate lead extraction
-            for i in range(5):
-                if not self.running:
-                    break
-                self.log(f"Processing listing {i+1}...")
+            self.agent.run()
                 
         except Exception as e:
             self.log(f"❌ Error: {str(e)}")
             messagebox.showerror("Error", f"Failed to start agent: {str(e)}")
         finally:
-            self.stop_agent()
+            # START comes back only once this thread is done with the browser
+            self.root.after(0, self.agent_finished)
     
     def stop_agent(self):
-        """Stop the agent"""
+        """Ask the running agent to stop; it finishes the current step first"""
+        if not self.running:
+            return
+        self.stop_event.set()
+        self.log("Stopping agent after the current step...")
+        self.stop_btn.config(state="disabled")
+        self.status_label.config(text="🟡 Stopping", foreground="orange")
+    
+    def agent_finished(self):
+        """Reset the controls once the agent thread has exited"""
         self.running = False
+        self.agent = None
         self.log("Agent stopped")
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
@@ -255,6 +338,7 @@ class LeadAgentGUI:
             messagebox.showerror("Error", f"Failed to save config: {str(e)}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = LeadAgentGUI(root)
     root.mainloop()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline stand-in for Selenium elements
+Parses saved card HTML with the standard library and supports the small
+CSS selector subset used by the card parsers, so they run without Chrome.
+.text follows the browser's rendered text (block elements on their own
+lines, adjacent inline text not separated) and href/src are resolved
+against the page URL, as Selenium returns them
+
+Supported selectors: tag, [attr], [attr='v'], [attr*='v'], [attr^='v'],
+[attr$='v'] and combinations like span[class*='price'] (no combinators)
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# Elements rendered on their own line(s) in innerText
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'dialog', 'div',
+    'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'summary', 'table', 'tr', 'ul',
+}
+HIDDEN_TAGS = {'script', 'style', 'template', 'noscript', 'head', 'title'}
+URL_ATTRIBUTES = {'href', 'src'}
+WHITESPACE = re.compile(r'\s+')
+
+SELECTOR_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:\[[^\]]+\])*)$')
+ATTRIBUTE_PATTERN = re.compile(r'''\[\s*([\w-]+)\s*(?:([*^$]?=)\s*['"]?([^'"\]]*)['"]?\s*)?\]''')
+
+class ElementNotFound(Exception):
+    """
+    Raised by find_element when nothing matches (like NoSuchElementException)
+    """
+
+def _parse_selector(selector):
+    match = SELECTOR_PATTERN.match(selector.strip())
+    if not match:
+        raise ValueError(f"Unsupported selector: {selector}")
+    tag = match.group(1).lower() if match.group(1) else None
+    conditions = ATTRIBUTE_PATTERN.findall(match.group(2) or "")
+    return tag, conditions
+
+def _attribute_matches(actual, op, expected):
+    if actual is None:
+        return False
+    if not op:
+        return True
+    if op == '=':
+        return actual == expected
+    if op == '*=':
+        return expected in actual
+    if op == '^=':
+        return actual.startswith(expected)
+    if op == '$=':
+        return actual.endswith(expected)
+    return False
+
+class HtmlElement:
+    """
+    Minimal element exposing .text, get_attribute, find_element(s)
+    """
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.parent = parent
+
+    @property
+    def text(self):
+        parts = []
+        self._collect_text(parts)
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        # Source whitespace collapses to a space; only <br> and block
+        # boundaries become line breaks
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(WHITESPACE.sub(" ", child))
+            elif child.tag == 'br':
+                parts.append("\n")
+            elif child.tag in BLOCK_TAGS:
+                parts.append("\n")
+                child._collect_text(parts)
+                parts.append("\n")
+            elif child.tag not in HIDDEN_TAGS:
+                child._collect_text(parts)
+
+    def get_attribute(self, name):
+        return self.attrs.get(name)
+
+    def _matches(self, tag, conditions):
+        if tag and self.tag != tag:
+            return False
+        return all(_attribute_matches(self.attrs.get(name), op, value) for name, op, value in conditions)
+
+    def _iter_descendants(self):
+        for child in self.children:
+            if isinstance(child, HtmlElement):
+                yield child
+                yield from child._iter_descendants()
+
+    def find_elements(self, by, selector):
+        """
+        All descendants matching the selector (by is ignored, CSS only)
+        """
+        tag, conditions = _parse_selector(selector)
+        return [el for el in self._iter_descendants() if el._matches(tag, conditions)]
+
+    def find_element(self, by, selector):
+        tag, conditions = _parse_selector(selector)
+        for el in self._iter_descendants():
+            if el._matches(tag, conditions):
+                return el
+        raise ElementNotFound(f"No element matches {selector}")
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, base_url=None):
+        super().__init__(convert_charrefs=True)
+        self.root = HtmlElement('#document')
+        self.current = self.root
+        self.base_url = base_url
+
+    def _element(self, tag, attrs):
+        attrs = {k: v if v is not None else "" for k, v in attrs}
+        if self.base_url:
+            for name in URL_ATTRIBUTES & attrs.keys():
+                attrs[name] = urljoin(self.base_url, attrs[name].strip())
+        element = HtmlElement(tag, attrs, self.current)
+        self.current.children.append(element)
+        return element
+
+    def handle_starttag(self, tag, attrs):
+        element = self._element(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self._element(tag, attrs)
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; ignore stray end tags
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+def parse_html(html, base_url=None):
+    """
+    Parse an HTML fragment, returns the document root element
+    Relative href/src values are resolved against base_url when given
+    """
+    builder = _TreeBuilder(base_url)
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+def parse_card(html, base_url=None):
+    """
+    Parse one saved card (its outerHTML) and return the card element itself
+    base_url is the page URL the card was captured on
+    """
+    root = parse_html(html, base_url)
+    elements = [child for child in root.children if isinstance(child, HtmlElement)]
+    return elements[0] if len(elements) == 1 else root
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact lead record used across extraction, storage and delivery
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+# Google Sheets column order (matches sheet_columns in config.json)
+SHEET_COLUMNS = [
+    "DATE", "NAME", "MOBILE", "REG_NO", "CAR_MODEL", "VARIANT", "YEAR",
+    "KM", "ADDRESS", "FOLLOW_UP", "SOURCE", "CONTEXT", "LICENSE", "REMARK",
+]
+
+def _text(value):
+    """
+    Normalize extractor output: "N/A" and empty strings become None
+    """
+    if value is None or value == "N/A" or value == "":
+        return None
+    return value
+
+def _int(value):
+    """
+    Parse year/km values, None when missing or not numeric
+    """
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def canonical_url(url):
+    """
+    Listing URL without query string and fragment: marketplace links carry
+    tracking parameters that change between page loads (ref=, tracking=)
+    """
+    url = _text(url)
+    if url is None:
+        return None
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+# Marketplace listing id in a listing URL, first pattern that matches wins:
+# OLX .../item/<slug>-iid-<id> and Facebook /marketplace/item/<id>/
+LISTING_ID_PATTERNS = [
+    re.compile(r"[/-]iid-(\d+)"),
+    re.compile(r"/marketplace/item/(\d+)"),
+]
+
+def listing_id(url):
+    """
+    Numeric marketplace listing id of a listing URL, None if it has none
+    """
+    url = canonical_url(url)
+    if url is None:
+        return None
+    for pattern in LISTING_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+def _bool(value):
+    if value is None:
+        return None
+    return bool(value)
+
+def _na(value):
+    return "N/A" if value is None else value
+
+class Lead:
+    """
+    One extracted lead
+    Uses __slots__ and native types (int year/km, bool is_owner, None for missing)
+    so large batches stay small in memory
+    """
+
+    __slots__ = (
+        "platform", "source", "title", "price", "seller_name", "phone",
+        "reg_no", "brand", "variant", "year", "km", "location", "is_owner",
+        "url", "extracted_date", "status", "follow_up", "city",
+    )
+
+    def __init__(self, platform=None, source=None, title=None, price=None,
+                 seller_name=None, phone=None, reg_no=None, brand=None,
+                 variant=None, year=None, km=None, location=None,
+                 is_owner=None, url=None, extracted_date=None,
+                 status="new", follow_up=None, city=None):
+        self.platform = platform
+        self.source = source
+        self.title = _text(title)
+        self.price = _text(price)
+        self.seller_name = _text(seller_name)
+        self.phone = _text(phone)
+        self.reg_no = _text(reg_no)
+        self.brand = _text(brand)
+        self.variant = _text(variant)
+        self.year = _int(year)
+        self.km = _int(km)
+        self.location = _text(location)
+        self.is_owner = _bool(is_owner)
+        self.url = _text(url)
+        self.extracted_date = extracted_date
+        self.status = status
+        self.follow_up = _text(follow_up)
+        self.city = _text(city)
+
+    def __repr__(self):
+        return f"Lead(platform={self.platform!r}, title={self.title!r}, phone={self.phone!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Lead):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    @property
+    def key(self):
+        """
+        Stable identity used for de-duplication across runs
+        Platform and listing id when the URL has one (captured API cards and
+        page links of the same listing agree), else the URL without query
+        and fragment, else a hash of the listing text
+        """
+        if listing_id(self.url):
+            basis = f"{self.platform}|{listing_id(self.url)}"
+        elif self.url:
+            basis = canonical_url(self.url)
+        else:
+            basis = "|".join(str(v or "") for v in (
+                self.platform, self.title, self.price, self.seller_name, self.location,
+            ))
+        return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a Lead from a plain dictionary (unknown keys are ignored)
+        """
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def to_dict(self):
+        """
+        Plain dictionary of all fields, JSON serializable
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_db_row(cls, row):
+        """
+        Build a Lead from a leads table row (sqlite3.Row)
+        """
+        is_owner = row["is_owner"]
+        return cls(
+            platform=row["platform"],
+            source=row["source"],
+            title=row["title"],
+            price=row["price"],
+            seller_name=row["name"],
+            phone=row["phone"],
+            reg_no=row["reg_no"],
+            brand=row["brand"],
+            variant=row["variant"],
+            year=row["year"],
+            km=row["km"],
+            location=row["location"],
+            is_owner=None if is_owner is None else bool(is_owner),
+            url=row["url"],
+            extracted_date=row["date"],
+            status=row["status"],
+            follow_up=row["follow_up"],
+            city=row["city"],
+        )
+
+    def to_db_row(self):
+        """
+        Column values for the leads table
+        """
+        return {
+            "date": self.extracted_date,
+            "phone": self.phone,
+            "brand": self.brand,
+            "year": self.year,
+            "km": self.km,
+            "platform": self.platform,
+            "status": self.status,
+            "name": self.seller_name,
+            "reg_no": self.reg_no,
+            "variant": self.variant,
+            "location": self.location,
+            "follow_up": self.follow_up or "Pending",
+            "source": self.source,
+            "is_owner": None if self.is_owner is None else int(self.is_owner),
+            "title": self.title,
+            "price": self.price,
+            "url": self.url,
+            "city": self.city,
+            "lead_key": self.key,
+        }
+
+    def to_sheet_payload(self):
+        """
+        Google Sheets webhook payload (14 columns, "N/A" for missing values)
+        """
+        return {
+            "DATE": _na(self.extracted_date),
+            "NAME": _na(self.seller_name),
+            "MOBILE": _na(self.phone),
+            "REG_NO": _na(self.reg_no),
+            "CAR_MODEL": _na(self.brand),
+            "VARIANT": _na(self.variant),
+            "YEAR": _na(self.year),
+            "KM": _na(self.km),
+            "ADDRESS": _na(self.location),
+            "FOLLOW_UP": self.follow_up or "Pending",
+            "SOURCE": _na(self.source),
+            "CONTEXT": f"Owner: {_na(self.is_owner)}",
+            "LICENSE": "Verified",
+            "REMARK": _na(self.title),
+        }
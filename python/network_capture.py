@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Listing extraction from captured network responses
+Chrome's performance log records every response the page receives; the
+JSON ones from the marketplace APIs (Facebook GraphQL, OLX search) are read
+back with the DevTools Network.getResponseBody command and turned into raw
+cards directly, so no per-card DOM traversal is needed. Pages whose data
+could not be captured fall back to the DOM card readers in agent.py
+"""
+
+import re
+import json
+import base64
+import logging
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# Response URLs that carry listing data, per platform (substring match)
+API_PATTERNS = {
+    "facebook": ["/api/graphql"],
+    "olx_webstore": ["/api/relevance/", "/api/v2/search", "/api/v4/search"],
+}
+
+def enable_capture(chrome_options):
+    """
+    Ask ChromeDriver to record network events in the performance log
+    """
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+def reset_capture(driver):
+    """
+    Drop logged events of earlier pages; call before navigating
+    """
+    try:
+        driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"Could not reset performance log: {e}")
+
+def _json_documents(body):
+    """
+    Parse a response body into JSON documents; Facebook streams several
+    newline-separated documents and may prefix them with for (;;);
+    """
+    body = body.strip()
+    if body.startswith("for (;;);"):
+        body = body[len("for (;;);"):]
+    try:
+        return [json.loads(body)]
+    except ValueError:
+        pass
+    documents = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            documents.append(json.loads(line))
+        except ValueError:
+            continue
+    return documents
+
+def captured_documents(driver, platform):
+    """
+    Drain the performance log and return JSON documents from the listing
+    API responses of one platform, in arrival order
+    """
+    patterns = API_PATTERNS.get(platform, [])
+    responses = {}
+    finished = []
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.responseReceived":
+            url = params.get("response", {}).get("url", "")
+            if any(pattern in url for pattern in patterns):
+                responses[params["requestId"]] = url
+        elif method == "Network.loadingFinished" and params.get("requestId") in responses:
+            finished.append(params["requestId"])
+
+    documents = []
+    for request_id in finished:
+        try:
+            result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            # Bodies are evicted from Chrome's buffer once the page navigates on
+            logger.debug(f"No body for {responses[request_id]}: {e}")
+            continue
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        documents.extend(_json_documents(body))
+    return documents
+
+def _walk(value):
+    """
+    Yield every dictionary nested anywhere in a JSON document
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            yield item
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+def _get(data, *path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def facebook_cards(documents):
+    """
+    Raw cards from Marketplace GraphQL listing nodes
+    """
+    cards = []
+    seen = set()
+    for document in documents:
+        for node in _walk(document):
+            if "marketplace_listing_title" not in node or node.get("id") in seen:
+                continue
+            seen.add(node.get("id"))
+            subtitles = [item.get("subtitle") for item in node.get("custom_sub_titles_with_rendering_flags") or []
+                         if isinstance(item, dict) and item.get("subtitle")]
+            cards.append({
+                "platform": "Facebook",
+                "source": "Facebook Marketplace",
+                "title": node.get("marketplace_listing_title"),
+                "price": _get(node, "listing_price", "formatted_amount"),
+                "seller_info": _get(node, "marketplace_listing_seller", "name"),
+                "location": _get(node, "location", "reverse_geocode", "city"),
+                "url": f"https://www.facebook.com/marketplace/item/{node['id']}/" if node.get("id") else None,
+                "description": _get(node, "redacted_description", "text") or node.get("description"),
+                "params": " | ".join(subtitles) or None,
+            })
+    return cards
+
+def _olx_url(ad):
+    """
+    Listing link of an OLX ad record: its own link field when the API sends
+    one, else the .../item/<slug>-iid-<id> form the site links to, so the
+    lead key matches the one read from the page
+    """
+    link = ad.get("url") or ad.get("link")
+    if isinstance(link, str) and link:
+        return urljoin("https://www.olx.in/", link)
+    if not ad.get("id"):
+        return None
+    slug = re.sub(r"[^a-z0-9]+", "-", (ad.get("title") or "").lower()).strip("-")
+    return f"https://www.olx.in/item/{slug}-iid-{ad['id']}" if slug else f"https://www.olx.in/item/iid-{ad['id']}"
+
+def olx_cards(documents):
+    """
+    Raw cards from OLX search API ad records
+    """
+    cards = []
+    seen = set()
+    for document in documents:
+        for ad in _walk(document):
+            if not ("title" in ad and "price" in ad and "locations_resolved" in ad) or ad.get("id") in seen:
+                continue
+            seen.add(ad.get("id"))
+            parameters = []
+            for parameter in ad.get("parameters") or []:
+                if isinstance(parameter, dict):
+                    label = parameter.get("key_name") or parameter.get("key")
+                    value = parameter.get("formatted_value") or parameter.get("value")
+                    if label and value:
+                        parameters.append(f"{label} {value}")
+            locations = ad.get("locations_resolved") or {}
+            location = ", ".join(
+                locations[key] for key in ("SUBLOCALITY_LEVEL_1_name", "ADMIN_LEVEL_3_name") if locations.get(key)
+            )
+            cards.append({
+                "platform": "OLX WebStore",
+                "source": "OLX WebStore",
+                "title": ad.get("title"),
+                "price": _get(ad, "price", "value", "display"),
+                "seller_info": _get(ad, "user", "name"),
+                "location": location or None,
+                "url": _olx_url(ad),
+                "description": ad.get("description"),
+                "params": " | ".join(parameters) or ad.get("main_info"),
+            })
+    return cards
+
+CARD_PARSERS = {
+    "facebook": facebook_cards,
+    "olx_webstore": olx_cards,
+}
+
+def captured_cards(driver, platform):
+    """
+    Raw cards for the current page from captured API responses
+    Empty when nothing usable was captured (caller falls back to the DOM)
+    """
+    try:
+        documents = captured_documents(driver, platform)
+    except Exception as e:
+        logger.warning(f"Network capture unavailable: {e}")
+        return []
+    return CARD_PARSERS[platform](documents)
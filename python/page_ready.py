@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Listing page readiness
+Waits until listing cards are present and have stopped changing, instead of
+fixed sleeps: an explicit wait for the first card, then a MutationObserver
+injected into the page that resolves once the cards stay unchanged for a
+short settle period. Fast pages return after the settle period, slow pages
+get up to the configured timeout
+"""
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Resolves with the card count once the set of cards (count and text size)
+# has not changed for settleMs; only card changes restart the settle timer
+STABLE_CARDS_SCRIPT = """
+const selector = arguments[0], minCards = arguments[1], settleMs = arguments[2];
+const done = arguments[arguments.length - 1];
+let signature = null;
+let timer = null;
+const read = () => {
+    const cards = document.querySelectorAll(selector);
+    let size = 0;
+    for (const card of cards) size += card.textContent.length;
+    return [cards.length, size];
+};
+const check = () => {
+    const [count, size] = read();
+    const current = count + ':' + size;
+    if (current === signature) return;
+    signature = current;
+    clearTimeout(timer);
+    if (count >= minCards) {
+        timer = setTimeout(() => { observer.disconnect(); done(count); }, settleMs);
+    }
+};
+const observer = new MutationObserver(check);
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+check();
+"""
+
+def _script_timeout(driver):
+    """
+    Current async script timeout of the session in seconds (WebDriver
+    default 30 when the driver cannot report it)
+    """
+    try:
+        return driver.timeouts.script
+    except Exception:
+        return 30
+
+def wait_for_cards(driver, selector, timeout=10, settle_ms=500, min_cards=1, stop_event=None):
+    """
+    Wait for listing cards matching a CSS selector to render and settle
+    Returns the card elements (possibly empty if none appeared in time or
+    stop_event was set while waiting)
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    started = time.time()
+    present = EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+    stop_event = stop_event or threading.Event()
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: stop_event.is_set() or present(d))
+    except TimeoutException:
+        logger.warning(f"No cards matching {selector} after {timeout}s")
+        return []
+    if stop_event.is_set():
+        logger.info("Stop requested while waiting for cards")
+        return []
+
+    remaining = max(timeout - (time.time() - started), settle_ms / 1000)
+    # The script timeout is session-wide: put back whatever it was before
+    previous = _script_timeout(driver)
+    try:
+        driver.set_script_timeout(remaining)
+        count = driver.execute_async_script(STABLE_CARDS_SCRIPT, selector, min_cards, settle_ms)
+        logger.info(f"{count} cards ready after {time.time() - started:.1f}s")
+    except TimeoutException:
+        # Cards kept changing (infinite feed, live updates): use what is there
+        logger.warning(f"Cards still changing after {timeout}s, reading current page")
+    except WebDriverException as e:
+        logger.warning(f"Card observer failed, reading current page: {e}")
+    finally:
+        try:
+            driver.set_script_timeout(previous)
+        except WebDriverException as e:
+            logger.warning(f"Could not restore script timeout: {e}")
+
+    return driver.find_elements(By.CSS_SELECTOR, selector)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import-time profile for the GUI and CLI entry modules
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter,
+prints the slowest imports and fails if a heavy dependency is loaded eagerly
+
+Usage:
+    python profile_imports.py                  # checks gui_app and agent
+    python profile_imports.py gui_app --top 30
+"""
+
+import sys
+import argparse
+import subprocess
+
+# Must only be imported when a browser run or delivery starts
+HEAVY_MODULES = ["selenium", "webdriver_manager", "requests", "pandas", "numpy"]
+
+DEFAULT_MODULES = ["gui_app", "agent"]
+
+def profile_module(module):
+    """
+    Returns list of (cumulative_us, self_us, name) for one fresh import
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            entries.append((int(cumulative_us), int(self_us), name.rstrip()))
+        except ValueError:
+            continue
+    return entries
+
+def report(module, top=15, budget_ms=None):
+    """
+    Print the profile for one module, returns False if a check failed
+    """
+    entries = profile_module(module)
+    top_level = [e for e in entries if not e[2].startswith("  ")]
+    total_ms = sum(e[0] for e in top_level) / 1000
+    loaded = {e[2].strip() for e in entries}
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+
+    print(f"\n=== import {module}: {total_ms:.1f} ms total ===")
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:9.1f} ms  {self_us / 1000:8.1f} ms self  {name.strip()}")
+
+    ok = True
+    if heavy:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(heavy)}")
+        ok = False
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds budget of {budget_ms} ms")
+        ok = False
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import time of the entry modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    parser.add_argument("--budget-ms", type=float, default=500, help="Fail above this total import time")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for module in args.modules:
+        try:
+            ok = report(module, args.top, args.budget_ms) and ok
+        except RuntimeError as e:
+            print(f"FAIL: {e}")
+            ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diff-based incremental sync to Google Sheets
+A local mirror (sheet_mirror table in leads.db) remembers what each sheet
+row holds, keyed by lead key with a content hash, so a sync only sends new
+rows and the changed cells of existing rows, in batches. Leads already sent row by row before the mirror existed
+(delivery = 'sent' in leads.db) are seeded into it instead of inserted again
+
+The webhook must understand the batch format below (see README for the
+Apps Script):
+    {"action": "sync",
+     "inserts": [{"key": ..., "row": {14 columns}}],
+     "updates": [{"key": ..., "row_number": 12, "cells": {"FOLLOW_UP": ...}}]}
+and answer {"rows": {"<key>": <row_number>, ...}} for the inserted rows
+
+Usage:
+    python sheets_sync.py              # sync every stored lead
+    python sheets_sync.py --dry-run    # only show what would be sent
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+import lead_store
+from models import Lead, SHEET_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+def ensure_schema(conn):
+    """
+    Create the sheet mirror table
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sheet_mirror (
+            lead_key TEXT PRIMARY KEY,
+            row_number INTEGER,
+            row_hash TEXT,
+            cells TEXT,
+            synced_at TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+def row_hash(payload):
+    """
+    Content hash of one sheet row in column order
+    """
+    values = json.dumps([payload.get(column) for column in SHEET_COLUMNS], ensure_ascii=False)
+    return hashlib.sha1(values.encode('utf-8')).hexdigest()
+
+class SheetSync:
+    """
+    Compute and send the minimal set of row inserts and cell updates
+    """
+
+    def __init__(self, conn, webhook_url, batch_size=200, timeout=30):
+        self.conn = conn
+        self.webhook_url = webhook_url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        ensure_schema(conn)
+
+    def _mirror_rows(self, keys):
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self.conn.execute(
+                f"SELECT lead_key, row_number, row_hash, cells FROM sheet_mirror WHERE lead_key IN ({placeholders})",
+                batch
+            )
+            for key, row_number, digest, cells in rows:
+                found[key] = (row_number, digest, cells)
+        return found
+
+    def _seed(self, items):
+        """
+        Add mirror entries for leads already delivered by the per-lead
+        webhook; their row number is unknown, so they get no cell updates
+        """
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sheet_mirror (lead_key, row_number, row_hash, cells, synced_at) "
+                "VALUES (?, NULL, ?, ?, ?)",
+                [(key, row_hash(payload), json.dumps(payload, ensure_ascii=False), now) for key, payload in items]
+            )
+
+    def plan(self, items, seed=False):
+        """
+        items: iterable of (key, payload) pairs
+        Returns (inserts, updates); unchanged rows and rows already sent
+        outside the mirror are left out
+        seed: also record those already-sent rows in the mirror (sync()
+        does; a dry run does not write)
+        """
+        items = list(items)
+        mirror = self._mirror_rows([key for key, _ in items])
+        missing = [(key, payload) for key, payload in items if key not in mirror]
+        sent = lead_store.known_keys(self.conn, [key for key, _ in missing], delivery="sent")
+        if sent and seed:
+            self._seed([(key, payload) for key, payload in missing if key in sent])
+            logger.info(f"Seeded sheet mirror with {len(sent)} rows already sent")
+        inserts = []
+        updates = []
+        unaddressable = 0
+        for key, payload in items:
+            if key in sent:
+                continue
+            digest = row_hash(payload)
+            known = mirror.get(key)
+            if known is None:
+                inserts.append({"key": key, "row": payload, "hash": digest})
+                continue
+
+            row_number, old_digest, old_cells = known
+            if digest == old_digest:
+                continue
+            old = json.loads(old_cells) if old_cells else {}
+            cells = {column: payload.get(column) for column in SHEET_COLUMNS
+                     if payload.get(column) != old.get(column)}
+            if row_number is None:
+                # Row is in the sheet but its number was never reported:
+                # sending it again would duplicate it, so leave it as is
+                unaddressable += 1
+            else:
+                updates.append({"key": key, "row_number": row_number, "cells": cells,
+                                "row": payload, "hash": digest})
+        if unaddressable:
+            logger.warning(f"{unaddressable} changed rows have no known sheet row number, not updated")
+        return inserts, updates
+
+    def _post(self, inserts, updates):
+        import requests
+
+        body = {
+            "action": "sync",
+            "inserts": [{"key": item["key"], "row": item["row"]} for item in inserts],
+            "updates": [{"key": item["key"], "row_number": item["row_number"], "cells": item["cells"]}
+                        for item in updates],
+        }
+        response = requests.post(self.webhook_url, json=body, timeout=self.timeout)
+        if response.status_code not in [200, 201]:
+            raise RuntimeError(f"Sync request failed: {response.status_code}")
+        try:
+            return response.json().get("rows", {})
+        except ValueError:
+            return {}
+
+    def _record(self, items, row_numbers):
+        now = datetime.now().isoformat()
+        with self.conn:
+            for item in items:
+                row_number = item.get("row_number") or row_numbers.get(item["key"])
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sheet_mirror (lead_key, row_number, row_hash, cells, synced_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (item["key"], row_number, item["hash"], json.dumps(item["row"], ensure_ascii=False), now)
+                )
+
+    def push(self, inserts, updates):
+        """
+        Send planned changes in batches and update the mirror after each one
+        Returns number of rows sent
+        """
+        sent = 0
+        changes = [("insert", item) for item in inserts] + [("update", item) for item in updates]
+        for start in range(0, len(changes), self.batch_size):
+            batch = changes[start:start + self.batch_size]
+            batch_inserts = [item for kind, item in batch if kind == "insert"]
+            batch_updates = [item for kind, item in batch if kind == "update"]
+            row_numbers = self._post(batch_inserts, batch_updates)
+            self._record(batch_inserts + batch_updates, row_numbers)
+            sent += len(batch)
+        return sent
+
+    def sync(self, items):
+        """
+        Plan and push one batch of (key, payload) pairs
+        Returns (inserted, updated)
+        """
+        inserts, updates = self.plan(items, seed=True)
+        if inserts or updates:
+            self.push(inserts, updates)
+        return len(inserts), len(updates)
+
+    def sync_leads(self, leads):
+        return self.sync((lead.key, lead.to_sheet_payload()) for lead in leads)
+
+    def sync_store(self, chunk_size=2000, dry_run=False):
+        """
+        Sync every lead in the leads table, streaming it in chunks
+        Returns (inserted, updated)
+        """
+        inserted = updated = 0
+        for rows in lead_store.iter_leads(self.conn, chunk_size=chunk_size):
+            items = [(row["lead_key"] or f"id:{row['id']}", Lead.from_db_row(row).to_sheet_payload())
+                     for row in rows]
+            if dry_run:
+                inserts, updates = self.plan(items)
+                inserted += len(inserts)
+                updated += len(updates)
+            else:
+                counts = self.sync(items)
+                inserted += counts[0]
+                updated += counts[1]
+        logger.info(f"Sheets sync: {inserted} new rows, {updated} updated rows")
+        return inserted, updated
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description="Incrementally sync stored leads to Google Sheets")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the changes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    settings = config.get('sheets_sync', {})
+    conn = lead_store.connect(config.get('database', lead_store.DEFAULT_DB_PATH))
+    try:
+        syncer = SheetSync(conn, config.get('webhook_url'), batch_size=settings.get('batch_size', 200))
+        syncer.sync_store(dry_run=args.dry_run)
+    except Exception as e:
+        logger.error(f"Sheets sync failed: {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Listing page snapshot archive (record / replay)
+Each visited listing page is stored as one zlib-compressed record of its
+card HTML in an append-only data file, with a fixed-size binary index next
+to it. Replay memory-maps both files and feeds the cards back through the
+Facebook/OLX card parsers, no Chrome needed
+
+Usage:
+    python snapshots.py stats snapshots/pages
+    python snapshots.py replay snapshots/pages --output leads.jsonl [--platform facebook]
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import struct
+import argparse
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# offset, compressed length, captured_at (UNIX time), platform name
+INDEX_RECORD = struct.Struct("<QId16s")
+
+@contextmanager
+def _exclusive_lock(lock_path):
+    """
+    Hold an exclusive OS file lock on lock_path (blocks until it is free)
+    Serializes appends of processes sharing one archive (GUI, daemon and
+    cluster workers all default to snapshots/pages)
+    """
+    with open(lock_path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+
+            # msvcrt locks bytes from the current position: always byte 0
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK itself gives up after ~10 s of retries
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+class SnapshotArchive:
+    """
+    Append-only archive of listing page snapshots
+    Files: <path>.dat (compressed records), <path>.idx (index) and
+    <path>.lock (held while appending)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.data_path = self.path.with_suffix('.dat')
+        self.index_path = self.path.with_suffix('.idx')
+        self.lock_path = self.path.with_suffix('.lock')
+
+    def append(self, platform, url, cards, city=None):
+        """
+        Add one page snapshot (list of card outerHTML strings)
+        Returns the record number
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        captured_at = time.time()
+        record = json.dumps({
+            "platform": platform,
+            "url": url,
+            "city": city,
+            "captured_at": datetime.fromtimestamp(captured_at).isoformat(),
+            "cards": cards,
+        }).encode('utf-8')
+        blob = zlib.compress(record, 6)
+
+        # The offset read at the end of the data file is only valid while
+        # no other process can append: hold the lock for data + index
+        with _exclusive_lock(self.lock_path):
+            with open(self.data_path, 'ab') as data:
+                offset = data.seek(0, os.SEEK_END)
+                data.write(blob)
+                data.flush()
+                os.fsync(data.fileno())
+
+            # Index entry goes last: a crash can leave unindexed bytes at the
+            # end of the data file, never an index entry pointing at nothing
+            with open(self.index_path, 'ab') as index:
+                position = index.seek(0, os.SEEK_END) // INDEX_RECORD.size
+                index.write(INDEX_RECORD.pack(offset, len(blob), captured_at, platform.encode('utf-8')[:16]))
+        return position
+
+    def __len__(self):
+        if not self.index_path.exists():
+            return 0
+        return self.index_path.stat().st_size // INDEX_RECORD.size
+
+    def iter_pages(self, platform=None):
+        """
+        Yield page snapshot dictionaries, optionally for one platform
+        Both files are memory-mapped, so only the touched pages are read
+        """
+        count = len(self)
+        if count == 0:
+            return
+
+        with open(self.index_path, 'rb') as index_file, open(self.data_path, 'rb') as data_file:
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as index, \
+                    mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                wanted = platform.encode('utf-8')[:16] if platform else None
+                for number in range(count):
+                    offset, length, _, name = INDEX_RECORD.unpack_from(index, number * INDEX_RECORD.size)
+                    if wanted and name.rstrip(b"\0") != wanted:
+                        continue
+                    yield json.loads(zlib.decompress(data[offset:offset + length]))
+
+    def stats(self):
+        """
+        Page and card counts per platform plus file sizes
+        """
+        pages = {}
+        cards = 0
+        for page in self.iter_pages():
+            pages[page["platform"]] = pages.get(page["platform"], 0) + 1
+            cards += len(page["cards"])
+        return {
+            "pages": pages,
+            "cards": cards,
+            "data_bytes": self.data_path.stat().st_size if self.data_path.exists() else 0,
+            "index_bytes": self.index_path.stat().st_size if self.index_path.exists() else 0,
+        }
+
+def replay_card(item):
+    """
+    Re-parse one archived card: (platform, html, city, captured_at, page_url)
+    -> Lead or None; links resolve against page_url like they did live
+    Top-level so enrichment pool workers can run parsing as well
+    """
+    from agent import LeadAgent
+    from html_card import parse_card
+    from enrichment import enrich_card
+
+    platform, html, city, captured_at, page_url = item
+    if platform == "facebook":
+        card = LeadAgent.read_facebook_card(parse_card(html, page_url))
+    elif platform == "olx_webstore":
+        card = LeadAgent.read_olx_card(parse_card(html, page_url))
+    else:
+        return None
+    if not card:
+        return None
+    card["city"] = city
+    card["extracted_date"] = captured_at
+    return enrich_card(card)
+
+def replay(archive, platform=None, enricher=None, batch_size=5000):
+    """
+    Re-extract leads from an archive, yields Lead records in archive order
+    HTML parsing and enrichment both run on the enrichment process pool
+    """
+    from enrichment import ParallelEnricher
+
+    own_enricher = enricher is None
+    if own_enricher:
+        enricher = ParallelEnricher()
+    try:
+        batch = []
+        for page in archive.iter_pages(platform):
+            for html in page["cards"]:
+                batch.append((page["platform"], html, page.get("city"), page["captured_at"], page.get("url")))
+            if len(batch) >= batch_size:
+                yield from (lead for lead in enricher.map(replay_card, batch) if lead)
+                batch = []
+        if batch:
+            yield from (lead for lead in enricher.map(replay_card, batch) if lead)
+    finally:
+        if own_enricher:
+            enricher.close()
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description="Inspect or replay listing page snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats_parser = sub.add_parser("stats", help="Show archive contents")
+    stats_parser.add_argument("archive", help="Archive path without extension, e.g. snapshots/pages")
+    replay_parser = sub.add_parser("replay", help="Re-run extraction over archived pages")
+    replay_parser.add_argument("archive", help="Archive path without extension, e.g. snapshots/pages")
+    replay_parser.add_argument("--platform", choices=["facebook", "olx_webstore"])
+    replay_parser.add_argument("--output", help="Write leads as JSONL here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    archive = SnapshotArchive(args.archive)
+
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), indent=2))
+        return 0
+
+    started = time.time()
+    count = 0
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for lead in replay(archive, args.platform):
+            count += 1
+            if out:
+                out.write(json.dumps(lead.to_dict()) + "\n")
+    finally:
+        if out:
+            out.close()
+    logger.info(f"Replayed {count} leads in {time.time() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
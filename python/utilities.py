@@ -9,6 +9,40 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import, so every process (including
+# enrichment pool workers) pays the compile cost a single time
+
+# Pattern for Indian phone numbers
+PHONE_PATTERNS = [
+    re.compile(r'\+91[-\s]?(\d{10})'),  # +91 format
+    re.compile(r'91[-\s]?(\d{10})'),     # 91 format
+    re.compile(r'(\d{10})'),              # 10 digit format
+    re.compile(r'(\d{3}[-\s]?\d{3}[-\s]?\d{4})'),  # xxx-xxx-xxxx format
+]
+NON_DIGIT_PATTERN = re.compile(r'[^0-9]')
+
+YEAR_PATTERN = re.compile(r'(19\d{2}|20\d{2})')
+
+KM_PATTERNS = [
+    re.compile(r'(\d{1,3}(?:,\d{3})*|\d+)\s*(?:km|KM|Km)', re.IGNORECASE),  # 50000 km or 50,000 km
+    re.compile(r'(\d+)\s*[kK]\s*(?:km|KM)', re.IGNORECASE),                   # 50k km
+]
+
+BRANDS = [
+    'Maruti', 'Hyundai', 'Mahindra', 'Tata', 'Toyota', 'Honda',
+    'Renault', 'Kia', 'Skoda', 'Volkswagen', 'Ford', 'Suzuki',
+    'Bajaj', 'Datsun', 'Chevrolet', 'Audi', 'BMW', 'Mercedes',
+    'Jaguar', 'Land Rover', 'Audi', 'Porsche', 'MG', 'Citroen',
+    'FORCE', 'Isuzu', 'Jeep', 'Ambassador', 'Hindustan',
+]
+BRAND_MODEL_PATTERNS = {
+    brand: re.compile(rf'{brand}\s+([\w\s]+?)(?:\d{{1,2}}|$)', re.IGNORECASE)
+    for brand in BRANDS
+}
+
+# Indian vehicle registration pattern
+REG_NO_PATTERN = re.compile(r'([A-Z]{2}[-\s]?\d{2}[-\s]?[A-Z]{2}[-\s]?\d{4})', re.IGNORECASE)
+
 def extract_phone(text):
     """
     Extract phone numbers from text
@@ -17,19 +51,11 @@ def extract_phone(text):
     if not text:
         return "N/A"
     
-    # Pattern for Indian phone numbers
-    patterns = [
-        r'\+91[-\s]?(\d{10})',  # +91 format
-        r'91[-\s]?(\d{10})',     # 91 format
-        r'(\d{10})',              # 10 digit format
-        r'(\d{3}[-\s]?\d{3}[-\s]?\d{4})',  # xxx-xxx-xxxx format
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in PHONE_PATTERNS:
+        match = pattern.search(text)
         if match:
             phone = match.group(1) if match.groups() else match.group(0)
-            phone = re.sub(r'[^0-9]', '', phone)  # Remove non-digits
+            phone = NON_DIGIT_PATTERN.sub('', phone)  # Remove non-digits
             if len(phone) >= 10:
                 return phone[-10:]  # Return last 10 digits
     
@@ -44,8 +70,7 @@ def extract_year(text):
         return "N/A"
     
     # Look for 4-digit year
-    pattern = r'(19\d{2}|20\d{2})'
-    matches = re.findall(pattern, text)
+    matches = YEAR_PATTERN.findall(text)
     
     if matches:
         # Return the most likely year (usually the last mentioned)
@@ -66,13 +91,8 @@ def extract_km(text):
     if not text:
         return "N/A"
     
-    patterns = [
-        r'(\d{1,3}(?:,\d{3})*|\d+)\s*(?:km|KM|Km)',  # 50000 km or 50,000 km
-        r'(\d+)\s*[kK]\s*(?:km|KM)',                   # 50k km
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in KM_PATTERNS:
+        match = pattern.search(text)
         if match:
             km = match.group(1)
             km = km.replace(',', '')  # Remove commas
@@ -98,20 +118,11 @@ def extract_brand(text):
     if not text:
         return "N/A"
     
-    brands = [
-        'Maruti', 'Hyundai', 'Mahindra', 'Tata', 'Toyota', 'Honda',
-        'Renault', 'Kia', 'Skoda', 'Volkswagen', 'Ford', 'Suzuki',
-        'Bajaj', 'Datsun', 'Chevrolet', 'Audi', 'BMW', 'Mercedes',
-        'Jaguar', 'Land Rover', 'Audi', 'Porsche', 'MG', 'Citroen',
-        'FORCE', 'Isuzu', 'Jeep', 'Ambassador', 'Hindustan',
-    ]
-    
     text_lower = text.lower()
-    for brand in brands:
+    for brand in BRANDS:
         if brand.lower() in text_lower:
             # Try to extract model name
-            pattern = rf'{brand}\s+([\w\s]+?)(?:\d{{1,2}}|$)'
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = BRAND_MODEL_PATTERNS[brand].search(text)
             if match:
                 return f"{brand} {match.group(1).strip()}".strip()
             return brand
@@ -160,9 +171,7 @@ def extract_registration_number(text):
     if not text:
         return "N/A"
     
-    # Indian vehicle registration pattern
-    pattern = r'([A-Z]{2}[-\s]?\d{2}[-\s]?[A-Z]{2}[-\s]?\d{4})'
-    match = re.search(pattern, text, re.IGNORECASE)
+    match = REG_NO_PATTERN.search(text)
     
     if match:
         reg_no = match.group(1).replace('-', '').replace(' ', '').upper()
@@ -203,11 +212,16 @@ def sanitize_data(data):
 def validate_lead(lead):
     """
     Validate if lead has minimum required information
+    Accepts a Lead record or a plain dictionary
     """
     required_fields = ['phone', 'brand', 'year']
     
     for field in required_fields:
-        if field not in lead or lead[field] == "N/A":
+        if isinstance(lead, dict):
+            value = lead.get(field)
+        else:
+            value = getattr(lead, field, None)
+        if value is None or value == "N/A":
             return False
     
     return True